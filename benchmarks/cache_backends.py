@@ -0,0 +1,66 @@
+"""Throughput of the SQLite cache backend against LocMem and files.
+
+Run from the repository root::
+
+    python benchmarks/cache_backends.py
+"""
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache.backends.filebased import (  # noqa: E402
+    FileBasedCache)
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from core.cache import SQLiteCache  # noqa: E402
+
+PARAMS = {'OPTIONS': {'MAX_ENTRIES': 100_000}}
+KEYS = [f'blog:post:{number}' for number in range(1_000)]
+# About the size of a pickled post of a feed page.
+VALUE = {'title': 'Заголовок', 'excerpt': 'Текст ' * 20, 'comments': 3}
+REPEAT = 2_000
+
+
+def operations(cache):
+    keys = iter(KEYS * (REPEAT // len(KEYS) + 2))
+    return {
+        'set': lambda: cache.set(next(keys), VALUE),
+        'get': lambda: cache.get(next(keys)),
+        'get_many(10)': lambda: cache.get_many(KEYS[:10]),
+        'add (lock)': lambda: cache.add('lock', True, 0),
+        'incr': lambda: cache.incr('counter'),
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            'locmem': LocMemCache('benchmark', PARAMS),
+            'filebased': FileBasedCache(
+                os.path.join(directory, 'files'), PARAMS),
+            'sqlite': SQLiteCache(
+                os.path.join(directory, 'cache.sqlite3'), PARAMS),
+        }
+        names = list(operations(None))
+        print(f'{"ops/s":>12}' + ''.join(f'{name:>14}' for name in names))
+        for backend, cache in backends.items():
+            cache.set_many({key: VALUE for key in KEYS})
+            cache.set('counter', 0)
+            row = f'{backend:>12}'
+            for name, operation in operations(cache).items():
+                seconds = timeit.timeit(operation, number=REPEAT)
+                row += f'{REPEAT / seconds:>14,.0f}'
+            print(row)
+
+
+if __name__ == '__main__':
+    main()
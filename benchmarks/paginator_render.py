@@ -0,0 +1,60 @@
+"""Render time of includes/paginator.html as the number of pages grows.
+
+Run from the repository root::
+
+    python benchmarks/paginator_render.py
+"""
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.paginator import Paginator  # noqa: E402
+from django.template.loader import get_template  # noqa: E402
+
+from blog.constants import (  # noqa: E402
+    PAGES_ON_EACH_SIDE,
+    PAGES_ON_ENDS,
+    POSTS_PER_PAGE)
+
+PAGE_COUNTS = (10, 100, 1_000, 10_000, 50_000)
+REPEAT = 200
+
+
+def render(template, num_pages, elided=True):
+    paginator = Paginator(range(num_pages * POSTS_PER_PAGE), POSTS_PER_PAGE)
+    page = paginator.page(num_pages // 2)
+    page_range = (
+        paginator.get_elided_page_range(
+            page.number, on_each_side=PAGES_ON_EACH_SIDE, on_ends=PAGES_ON_ENDS
+        ) if elided else paginator.page_range
+    )
+    return template.render({'page_obj': page, 'page_range': page_range})
+
+
+def main():
+    template = get_template('includes/paginator.html')
+    print(f'{"pages":>8} {"elided, ms":>12} {"full, ms":>12} {"links":>6}')
+    for num_pages in PAGE_COUNTS:
+        elided = timeit.timeit(
+            lambda: render(template, num_pages), number=REPEAT)
+        full_runs = max(1, REPEAT * 10 // num_pages)
+        full = timeit.timeit(
+            lambda: render(template, num_pages, elided=False),
+            number=full_runs)
+        links = render(template, num_pages).count('<li')
+        print(
+            f'{num_pages:>8} {elided / REPEAT * 1000:>12.3f}'
+            f' {full / full_runs * 1000:>12.3f} {links:>6}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ class PostAdmin(admin.ModelAdmin):
         'title',
         'pub_date',
         'created_at',
+        'updated_at',
         'author',
         'location',
         'category',
@@ -22,6 +23,12 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('title', 'author__username')
     list_filter = ('is_published', 'location', 'category', 'created_at')
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # Each editable row renders the same choices.
+        if db_field.name in ('category', 'location'):
+            kwargs['queryset'] = db_field.related_model.objects.cache()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
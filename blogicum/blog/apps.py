@@ -5,3 +5,10 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from core.querycache import install
+        from . import signals  # noqa: F401
+        connection_created.connect(install)
@@ -1,5 +1,57 @@
 POSTS_PER_PAGE = 10
 
+CURSOR_PAGINATION = False
+
+PAGES_ON_EACH_SIDE = 2
+
+PAGES_ON_ENDS = 1
+
+FEED_COUNT_TIMEOUT = 60 * 60 * 24
+
+FEED_COUNT_APPROXIMATE_THRESHOLD = 10_000
+
+FEED_COUNT_APPROXIMATE_TIMEOUT = 60 * 5
+
+FEED_CACHED_IDS = 1000
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+SCHEDULER_INTERVAL = 60
+
+USER_ID_CACHE_TIMEOUT = 60 * 60 * 24
+
+REFERENCES_VERSION_TIMEOUT = 60 * 60 * 24
+
+PAGE_CACHE = True
+
+SHARED_PAGES = False
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+PAGE_STALE_TIMEOUT = 60 * 60
+
+PAGE_TAG_TIMEOUT = 60 * 60 * 24
+
+NOT_FOUND_TIMEOUT = 60
+
+EDGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+EDGE_PURGE_DELAY = 0.05
+
+CACHE_LOCK_TIMEOUT = 30
+
+CACHE_LOCK_WAIT = 2
+
+CACHE_LOCK_POLL = 0.05
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+QUERY_CACHE_TIMEOUT = 60 * 10
+
+EXCERPT_WORDS = 10
+
+TEXT_HTML_VERSION = 1
+
 TITLE_TEXT_SLICE = 20
 
 COMMENT_TEXT_SLICE = 15
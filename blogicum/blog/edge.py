@@ -0,0 +1,150 @@
+"""Surrogate keys and purging of the HTTP cache in front of the app.
+
+Cached pages are sent with a ``Surrogate-Key`` header derived from their
+page cache tags: ``feed-index``, ``category-<slug>``, ``author-<id>``,
+``post-<id>``. When ``blog.pagecache.purge_tags()`` expires tags, the
+matching keys are sent to every purger of ``settings.EDGE_PURGERS``
+once the transaction commits:
+
+    EDGE_PURGERS = [{
+        'BACKEND': 'blog.edge.HttpPurger',
+        'OPTIONS': {'url': 'http://127.0.0.1:6081/'},
+    }]
+
+The keys are sent by a background thread, so slow or unreachable caches
+do not hold up the response; ``flush()`` waits for it. The thread sends
+the keys queued within ``EDGE_PURGE_DELAY`` of each other in one
+request, so the keys of a transaction go together.
+"""
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .constants import EDGE_PURGE_DELAY
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_surrogate_key(tag: str):
+    """Surrogate key of a page cache tag, None for tags without one."""
+    kind, _, name = tag.partition(':')
+    if kind == 'post':
+        return f'post-{name}'
+    if kind == 'user':
+        return f'author-{name}'
+    if kind == 'username':
+        return f'username-{name}'
+    if kind == 'feed':
+        if name == 'index':
+            return 'feed-index'
+        kind, _, name = name.partition(':')
+        if kind == 'category':
+            return f'category-{name}'
+        if kind == 'author':
+            return f'author-{name.partition(":")[0]}'
+    return None
+
+
+def get_surrogate_keys(tags) -> list:
+    return sorted({get_surrogate_key(tag) for tag in tags} - {None})
+
+
+class BasePurger(ABC):
+    """Removes the responses tagged with any of the keys from a cache."""
+
+    @abstractmethod
+    def purge(self, keys):
+        """Purge the keys, a sorted list."""
+
+
+class HttpPurger(BasePurger):
+    """Sends the keys to ``url`` in a ``Surrogate-Key`` header.
+
+    One ``PURGE`` request per batch of keys, as Varnish with xkey and
+    Fastly take them.
+    """
+
+    def __init__(self, url, method='PURGE', header='Surrogate-Key',
+                 timeout=2, batch_size=256):
+        self.url = url
+        self.method = method
+        self.header = header
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+    def purge(self, keys):
+        for start in range(0, len(keys), self.batch_size):
+            request = Request(self.url, method=self.method, headers={
+                self.header: ' '.join(keys[start:start + self.batch_size]),
+            })
+            with urlopen(request, timeout=self.timeout):
+                pass
+
+
+def get_purgers() -> list:
+    return [
+        import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+        for config in getattr(settings, 'EDGE_PURGERS', [])
+    ]
+
+
+def send_purge(keys):
+    for purger in get_purgers():
+        try:
+            purger.purge(keys)
+        except Exception:
+            # The edge copies expire by their TTL anyway.
+            logger.exception('Purging %s failed', ' '.join(keys))
+
+
+def _work():
+    while True:
+        keys, count = set(_queue.get()), 1
+        # Keys queued meanwhile go in the same request.
+        while True:
+            try:
+                keys.update(_queue.get(timeout=EDGE_PURGE_DELAY))
+            except queue.Empty:
+                break
+            count += 1
+        try:
+            send_purge(sorted(keys))
+        except Exception:
+            logger.exception('Purging %s failed', ' '.join(sorted(keys)))
+        finally:
+            for _ in range(count):
+                _queue.task_done()
+
+
+def queue_purge(keys):
+    """Hand the keys to the background thread sending them."""
+    global _worker
+    with _worker_lock:
+        # A forked worker process does not inherit the thread.
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_work, name='edge-purge', daemon=True)
+            _worker.start()
+    _queue.put(keys)
+
+
+def flush():
+    """Wait until the queued keys are sent."""
+    _queue.join()
+
+
+def purge_tags(*tags):
+    """Purge the keys of the tags from the edge after the commit."""
+    keys = get_surrogate_keys(tags)
+    if keys and getattr(settings, 'EDGE_PURGERS', []):
+        transaction.on_commit(lambda: queue_purge(keys))
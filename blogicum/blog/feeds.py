@@ -0,0 +1,114 @@
+"""Two-phase feed fetch: cached id lists hydrated from a post cache."""
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .constants import FEED_CACHE_TIMEOUT, FEED_CACHED_IDS
+from .locks import get_or_compute
+from .pagecache import purge_tags
+from .paginators import invalidate_feed_counts
+from .utils import again_on_commit, get_listed_posts
+
+
+def get_feed_ids_key(feed: str) -> str:
+    return f'blog:feed-ids:{feed}'
+
+
+def get_post_key(post_id: int) -> str:
+    return f'blog:post:{post_id}'
+
+
+def invalidate_feeds(*feeds):
+    """Drop cached id lists, counts and pages of the feeds."""
+    def drop():
+        cache.delete_many([get_feed_ids_key(feed) for feed in feeds])
+        invalidate_feed_counts(*feeds)
+
+    again_on_commit(drop)
+    purge_tags(*(f'feed:{feed}' for feed in feeds))
+
+
+def invalidate_posts(*post_ids):
+    """Drop cached posts and pages showing them.
+
+    Called e.g. after comments or relations of the posts change.
+    """
+    again_on_commit(lambda: cache.delete_many(
+        [get_post_key(post_id) for post_id in post_ids]
+    ))
+    purge_tags(*(f'post:{post_id}' for post_id in post_ids))
+
+
+def get_posts_by_ids(post_ids) -> list:
+    """Posts in the order of ids: from the post cache, misses in one query.
+
+    Ids of posts deleted in the meantime are skipped.
+    """
+    cached = cache.get_many([get_post_key(post_id) for post_id in post_ids])
+    posts = {
+        post_id: cached[get_post_key(post_id)]
+        for post_id in post_ids
+        if get_post_key(post_id) in cached
+    }
+    missing = [post_id for post_id in post_ids if post_id not in posts]
+    if missing:
+        loaded = get_listed_posts().in_bulk(missing)
+        cache.set_many({
+            get_post_key(post_id): post for post_id, post in loaded.items()
+        }, FEED_CACHE_TIMEOUT)
+        posts.update(loaded)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+class Feed(Sequence):
+    """Ordered posts of a feed, sliced the way ``Paginator`` does it.
+
+    The first ``FEED_CACHED_IDS`` ids of the feed are kept in the cache,
+    ids of deeper pages fall back to slicing the queryset. Pages are
+    hydrated with ``get_posts_by_ids()``, after ``on_ids`` is called
+    with their ids.
+    """
+
+    def __init__(self, name: str, queryset: QuerySet, on_ids=None):
+        self.name = name
+        self.queryset = queryset
+        self.model = queryset.model
+        self.on_ids = on_ids
+
+    @cached_property
+    def ids(self) -> list:
+        return get_or_compute(
+            get_feed_ids_key(self.name),
+            lambda: list(
+                self.queryset.values_list('pk', flat=True)[
+                    :FEED_CACHED_IDS + 1]
+            ),
+            FEED_CACHE_TIMEOUT
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.ids) <= FEED_CACHED_IDS
+
+    def count(self) -> int:
+        if self.is_complete:
+            return len(self.ids)
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        if self.is_complete or (
+            index.stop is not None and index.stop <= FEED_CACHED_IDS
+        ):
+            ids = self.ids[index]
+        else:
+            ids = list(self.queryset.values_list('pk', flat=True)[index])
+        if self.on_ids is not None:
+            self.on_ids(ids)
+        return get_posts_by_ids(ids)
@@ -16,6 +16,12 @@ class PostForm(forms.ModelForm):
             )
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in ('category', 'location'):
+            field = self.fields[name]
+            field.queryset = field.queryset.cache()
+
 
 class CommentForm(forms.ModelForm):
     """Form for creating comment."""
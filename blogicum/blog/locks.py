@@ -0,0 +1,58 @@
+"""Single-flight recomputation of cached values.
+
+When a hot key is missing, only the worker holding its lock computes
+the value; the others wait briefly for it instead of running the same
+queries at once.
+"""
+import time
+
+from django.core.cache import cache
+
+from .constants import CACHE_LOCK_POLL, CACHE_LOCK_TIMEOUT, CACHE_LOCK_WAIT
+
+
+def get_lock_key(key: str) -> str:
+    return f'lock:{key}'
+
+
+def acquire(key: str) -> bool:
+    """Take the lock of the key; False if another worker holds it."""
+    return cache.add(get_lock_key(key), True, CACHE_LOCK_TIMEOUT)
+
+
+def release(key: str):
+    cache.delete(get_lock_key(key))
+
+
+def wait_for(get):
+    """Poll ``get()`` until it returns a value or ``CACHE_LOCK_WAIT`` ends."""
+    deadline = time.monotonic() + CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(CACHE_LOCK_POLL)
+        value = get()
+        if value is not None:
+            return value
+    return None
+
+
+def get_or_compute(key: str, compute, timeout):
+    """Cached value of the key, computed by one worker at a time.
+
+    ``timeout`` may be a function of the computed value. A worker that
+    waited in vain computes the value itself.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    locked = acquire(key)
+    if not locked:
+        value = wait_for(lambda: cache.get(key))
+        if value is not None:
+            return value
+    try:
+        value = compute()
+        cache.set(key, value, timeout(value) if callable(timeout) else timeout)
+    finally:
+        if locked:
+            release(key)
+    return value
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.constants import SCHEDULER_INTERVAL
+from blog.scheduling import get_next_pub_date, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = 'Publish deferred posts whose pub_date has come.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and publish every post at its pub_date.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=SCHEDULER_INTERVAL,
+            help='Longest sleep in seconds between checks for new posts.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for post in publish_due_posts():
+                self.stdout.write(f'Published post {post.pk}: {post}')
+            if not options['loop']:
+                return
+            time.sleep(self.get_delay(options['interval']))
+
+    def get_delay(self, interval):
+        """Seconds until the nearest scheduled post, at most interval."""
+        next_pub_date = get_next_pub_date()
+        if next_pub_date is None:
+            return interval
+        delay = (next_pub_date - timezone.now()).total_seconds()
+        return min(max(delay, 0), interval)
@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from blog.constants import TEXT_HTML_VERSION
+from blog.models import Comment, Post
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Render text HTML of posts and comments missing from the cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-render every row, not only the missing ones.'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            rendered = 0
+            rows = model.objects.only('text').order_by('pk')
+            batch = []
+            for row in rows.iterator(chunk_size=BATCH_SIZE):
+                batch.append(row)
+                if len(batch) == BATCH_SIZE:
+                    rendered += self.render(batch, options['all'])
+                    batch = []
+            rendered += self.render(batch, options['all'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {rendered}'
+            )
+
+    def render(self, rows, render_all):
+        rows = {row.get_text_html_key(): row for row in rows}
+        if not render_all:
+            for key in cache.get_many(rows, version=TEXT_HTML_VERSION):
+                del rows[key]
+        cache.set_many({
+            key: row.render_text_html() for key, row in rows.items()
+        }, None, version=TEXT_HTML_VERSION)
+        return len(rows)
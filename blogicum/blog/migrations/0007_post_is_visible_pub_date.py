@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:59
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hide_scheduled_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_visible=True,
+        pub_date__gt=timezone.now()
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликована сама публикация и её категория, и наступили дата и время публикации.', verbose_name='Видна всем'),
+        ),
+        migrations.RunPython(hide_scheduled_posts, migrations.RunPython.noop),
+    ]
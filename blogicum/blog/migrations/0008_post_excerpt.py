@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:01
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.only('text')
+    batch = []
+    for post in posts.iterator():
+        post.excerpt = Truncator(post.text).words(
+            EXCERPT_WORDS, truncate=' …')
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ('excerpt',))
+            batch = []
+    Post.objects.bulk_update(batch, ('excerpt',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_visible_pub_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Первые слова текста для ленты, обновляется само.', verbose_name='Начало текста'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Время изменения публикации или её комментариев.', verbose_name='Изменено'),
+        ),
+    ]
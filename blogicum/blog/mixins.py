@@ -1,34 +1,385 @@
+import logging
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
 from django.shortcuts import redirect
-from django.urls import reverse
+from django.urls import get_resolver, reverse
 from django.views.generic import ListView
 
-from .constants import POSTS_PER_PAGE
+from .constants import (
+    CURSOR_PAGINATION,
+    PAGE_CACHE,
+    PAGES_ON_EACH_SIDE,
+    PAGES_ON_ENDS,
+    POST_CARD_CACHE_TIMEOUT,
+    POSTS_PER_PAGE,
+    SHARED_PAGES)
+from .feeds import Feed, get_posts_by_ids
 from .models import Comment, Post
+from .pagecache import (
+    EXPIRED,
+    FRESH,
+    RENDER_ERRORS,
+    cache_page,
+    cache_validators,
+    get_cached_page,
+    get_current_validators,
+    get_not_modified,
+    get_page_response,
+    get_stale_response,
+    get_tag_versions,
+    lock_page,
+    unlock_page,
+    wait_for_page)
+from .paginators import (
+    CachedCountPaginator,
+    CursorPaginator,
+    InvalidCursor)
+from .registry import references
 from .utils import get_posts
 
+logger = logging.getLogger(__name__)
+
+
+class PageCacheMixin:
+    """Mixin serving anonymous GETs from the page cache.
+
+    Rendered pages are kept with the tags from ``get_page_tags()``, and
+    ``blog.feeds`` purges the tags when the feeds and posts change. The
+    versions of the tags are read before the data they guard: those of
+    ``get_known_tags()`` before the view runs, the others with
+    ``read_tag_versions()`` as soon as the view learns them.
+
+    With ``shared_pages`` on, a page rendered the same for every reader
+    (``is_page_shared()``) leaves slots for the header buttons, the
+    comment form and the edit links. A script fills them from
+    ``UserFragmentsView``, so logged in readers are served from the page
+    cache too.
+
+    An expired page is served stale and rendered again after the
+    response is sent; if rendering fails on the database or the cache,
+    the cached page is served instead of an error (see
+    ``blog.pagecache``).
+
+    Conditional GETs of fresh cached pages get a 304 without running
+    the view. For pages personal to a logged in reader only the
+    validators are cached, with the same tags.
+    """
+
+    page_cache = PAGE_CACHE
+    shared_pages = SHARED_PAGES
+
+    def get_page_tags(self) -> set:
+        return set()
+
+    def get_known_tags(self) -> set:
+        """Tags of the page known before the view reads any data."""
+        return set()
+
+    def read_tag_versions(self, tags) -> dict:
+        """Versions of the tags, each read once per render."""
+        tags = set(tags)
+        missing = tags - self.tag_versions.keys()
+        if missing:
+            self.tag_versions.update(get_tag_versions(missing))
+        return {tag: self.tag_versions[tag] for tag in tags}
+
+    def get_not_found_tags(self) -> set:
+        """Tags purged when what the page did not find appears."""
+        return set()
+
+    def is_page_shared(self) -> bool:
+        return self.shared_pages
+
+    def get_fragments_url(self) -> str:
+        return reverse('blog:user_fragments')
+
+    def uses_page_cache(self) -> bool:
+        return (
+            self.page_cache
+            and self.request.method in ('GET', 'HEAD')
+            and (
+                self.is_page_shared()
+                or not self.request.user.is_authenticated
+            )
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.is_page_shared():
+            context['shared_page'] = True
+            context['fragments_url'] = self.get_fragments_url()
+        return context
+
+    def uses_validators_cache(self) -> bool:
+        return (
+            self.page_cache
+            and self.request.method in ('GET', 'HEAD')
+            and self.request.user.is_authenticated
+        )
+
+    def get_validators_variant(self) -> str:
+        # A new CSRF cookie makes the tokens in the reader's copy stale.
+        return (
+            f'{self.request.user.pk}:{self.request.META.get("CSRF_COOKIE")}'
+        )
+
+    def can_serve(self, entry) -> bool:
+        """Whether the cached page may be served to the reader.
+
+        Only anonymous readers share not found pages: what is missing for
+        them may be the logged in reader's own unpublished post.
+        """
+        return (
+            entry['status'] == HTTPStatus.OK
+            or not self.request.user.is_authenticated
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        self.tag_versions = {}
+        if self.uses_page_cache():
+            return self.dispatch_cached(request, *args, **kwargs)
+        return self.dispatch_uncached(request, *args, **kwargs)
+
+    def dispatch_uncached(self, request, *args, **kwargs):
+        if self.uses_validators_cache():
+            return self.dispatch_personal(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def dispatch_cached(self, request, *args, **kwargs):
+        path = request.get_full_path()
+        cached = get_cached_page(path)
+        if cached is not None and not self.can_serve(cached[0]):
+            return self.dispatch_uncached(request, *args, **kwargs)
+        if cached is not None and cached[1] == FRESH:
+            return (
+                get_not_modified(request, cached[0])
+                or get_page_response(cached[0])
+            )
+        locked = lock_page(path)
+        if not locked:
+            # Another worker is rendering the page: serve the previous
+            # copy, or wait for the new one.
+            if cached is not None:
+                return get_stale_response(cached[0])
+            response = self.wait_for_render(path, request, *args, **kwargs)
+            if response is not None:
+                return response
+        elif cached is not None and cached[1] == EXPIRED:
+            return get_stale_response(cached[0], revalidate=lambda: (
+                self.revalidate_page(path, request, *args, **kwargs)
+            ))
+        try:
+            return self.render_page(path, request, *args, **kwargs)
+        except RENDER_ERRORS:
+            if cached is None:
+                raise
+            logger.exception('Serving stale page %s', path)
+            return get_stale_response(cached[0])
+        finally:
+            if locked:
+                unlock_page(path)
+
+    def wait_for_render(self, path, request, *args, **kwargs):
+        """Page rendered meanwhile by the worker holding the lock, or None."""
+        entry = wait_for_page(path)
+        if entry is None:
+            return None
+        if not self.can_serve(entry):
+            return self.dispatch_uncached(request, *args, **kwargs)
+        return get_not_modified(request, entry) or get_page_response(entry)
+
+    def dispatch_personal(self, request, *args, **kwargs):
+        path = request.get_full_path()
+        validators = get_current_validators(
+            path, self.get_validators_variant())
+        if validators is not None:
+            response = get_not_modified(request, validators)
+            if response is not None:
+                return response
+        # The header shows the reader, so their changes expire the
+        # validators.
+        self.read_tag_versions(
+            {*self.get_known_tags(), f'user:{request.user.pk}'})
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            if hasattr(response, 'render'):
+                response.render()
+            # The render may have issued the CSRF cookie.
+            cache_validators(
+                path,
+                self.get_validators_variant(),
+                response,
+                self.read_tag_versions(
+                    {*self.get_page_tags(), f'user:{request.user.pk}'})
+            )
+        response['Surrogate-Control'] = 'no-store'
+        return response
 
-class ListPostMixin(ListView):
-    """Mixin for post list."""
+    def render_page(self, path, request, *args, **kwargs):
+        """Run the view, keeping a rendered 200 or 404 in the cache."""
+        self.tag_versions = {}
+        try:
+            self.read_tag_versions(self.get_known_tags())
+            response = super().dispatch(request, *args, **kwargs)
+        except Http404 as exception:
+            # The 404 page shows the reader in the header, so only the
+            # anonymous one is shared; with DEBUG Django renders its own.
+            if settings.DEBUG or request.user.is_authenticated:
+                raise
+            response = get_resolver().resolve_error_handler(
+                HTTPStatus.NOT_FOUND)(request, exception)
+            self.cache_rendered(path, response, self.get_not_found_tags())
+            return response
+        if response.status_code == HTTPStatus.OK:
+            if hasattr(response, 'render'):
+                response.render()
+            self.cache_rendered(path, response, self.get_page_tags())
+        return response
+
+    def revalidate_page(self, path, request, *args, **kwargs):
+        try:
+            self.render_page(path, request, *args, **kwargs)
+        except Exception:
+            # The stale page stays until PAGE_STALE_TIMEOUT runs out.
+            logger.exception('Page %s was not revalidated', path)
+        finally:
+            unlock_page(path)
+
+    def cache_rendered(self, path, response, tags):
+        # Pages with a CSRF token are personal, even for anonymous users.
+        if self.uses_page_cache() and not self.request.META.get(
+                'CSRF_COOKIE_USED'):
+            cache_page(path, response, self.read_tag_versions(tags))
+        else:
+            response['Surrogate-Control'] = 'no-store'
+
+
+class ListPostMixin(PageCacheMixin, ListView):
+    """Mixin for post list.
+
+    With ``cursor_pagination`` on, pages are addressed by
+    ``?after=<pub_date,id>`` / ``?before=<pub_date,id>`` instead of
+    ``?page=<number>``. Offset pages are read through the ``Feed``
+    named by ``get_feed()``: cached post ids hydrated from the post
+    cache, with the total count cached too. They link only to the pages
+    around the current one and at the ends (``page_range``). Cursor
+    pages are read as ids and hydrated the same way. Categories and
+    locations of the page come from ``blog.registry``, and rendered post
+    cards are cached under ``post.card_version``, read before the posts.
+    """
 
     model = Post
     paginate_by = POSTS_PER_PAGE
+    paginator_class = CachedCountPaginator
+    cursor_pagination = CURSOR_PAGINATION
 
     def get_queryset(self):
         return get_posts()
 
+    def get_feed(self):
+        """Name of the feed for cached ids and counts."""
+        return 'index'
+
+    def get_not_found_tags(self):
+        return {f'feed:{self.get_feed()}'}
+
+    def get_known_tags(self):
+        return {f'feed:{self.get_feed()}'}
+
+    def get_page_tags(self):
+        return {
+            f'feed:{self.get_feed()}',
+            *(f'post:{post.pk}' for post in self.page_posts),
+        }
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(*args, feed=self.get_feed(), **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['card_cache_timeout'] = POST_CARD_CACHE_TIMEOUT
+        page = context['page_obj']
+        if context['is_paginated'] and not self.cursor_pagination:
+            context['page_range'] = page.paginator.get_elided_page_range(
+                page.number,
+                on_each_side=PAGES_ON_EACH_SIDE,
+                on_ends=PAGES_ON_ENDS
+            )
+        return context
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = self._paginate_feed(
+            queryset, page_size
+        )
+        self.page_posts = references.attach(object_list)
+        versions = self.read_post_versions(
+            post.pk for post in self.page_posts)
+        for post in self.page_posts:
+            post.card_version = versions[f'post:{post.pk}']
+        return paginator, page, object_list, is_paginated
+
+    def read_post_versions(self, post_ids) -> dict:
+        return self.read_tag_versions(
+            f'post:{post_id}' for post_id in post_ids)
+
+    def _paginate_feed(self, queryset, page_size):
+        if not self.cursor_pagination:
+            return super().paginate_queryset(
+                Feed(self.get_feed(), queryset,
+                     on_ids=self.read_post_versions),
+                page_size
+            )
+        paginator = CursorPaginator(
+            queryset.select_related(None).only('pub_date'), page_size)
+        try:
+            page = paginator.get_page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before')
+            )
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        ids = [post.pk for post in page.object_list]
+        self.read_post_versions(ids)
+        page.object_list = get_posts_by_ids(ids)
+        return paginator, page, page.object_list, page.has_other_pages()
+
 
-class UpDelPostMixin(LoginRequiredMixin):
+class AuthorObjectMixin(LoginRequiredMixin):
+    """Mixin for pages only the author of the object may use.
+
+    The object is loaded once per request: the author check in
+    ``dispatch()`` and the generic view share it.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def dispatch(self, request, *args, **kwargs):
+        obj = self.get_object()
+        if obj.author_id != request.user.pk:
+            return self.redirect_not_author(obj)
+        return super().dispatch(request, *args, **kwargs)
+
+    def redirect_not_author(self, obj):
+        return redirect(obj.get_absolute_url())
+
+
+class UpDelPostMixin(AuthorObjectMixin):
     """Mixin for update or delete post."""
 
     model = Post
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect(self.get_object().get_absolute_url())
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        return Post.objects.select_related('location')
 
 
 class CommentMixin(LoginRequiredMixin):
@@ -45,10 +396,11 @@ class CommentMixin(LoginRequiredMixin):
         )
 
 
-class CommentUpDelMixin(CommentMixin):
-    """Mixin for update or delete comment."""
+class CommentUpDelMixin(CommentMixin, AuthorObjectMixin):
+    """Mixin for update or delete comment of the post from the URL."""
 
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect('blog:post_detail', post_id=kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
+
+    def redirect_not_author(self, comment):
+        return redirect('blog:post_detail', post_id=comment.post_id)
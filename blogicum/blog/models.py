@@ -1,14 +1,21 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from core.models import PublishedTimeModel, TitleModel
-from .constants import TITLE_TEXT_SLICE, COMMENT_TEXT_SLICE
+from core.models import (
+    LoadedStateModel,
+    PublishedTimeModel,
+    RenderedTextModel,
+    TitleModel)
+from core.querycache import CachedQuerySet
+from .constants import COMMENT_TEXT_SLICE, EXCERPT_WORDS, TITLE_TEXT_SLICE
 
 User = get_user_model()
 
 
-class Category(PublishedTimeModel, TitleModel):
+class Category(PublishedTimeModel, TitleModel, LoadedStateModel):
     """Post category model."""
 
     description = models.TextField('Описание')
@@ -19,6 +26,8 @@ class Category(PublishedTimeModel, TitleModel):
                    'разрешены символы латиницы, цифры, дефис и подчёркивание.')
     )
 
+    objects = CachedQuerySet.as_manager()
+
     class Meta:
         """Russian translate."""
 
@@ -34,6 +43,8 @@ class Location(PublishedTimeModel):
         verbose_name='Название места'
     )
 
+    objects = CachedQuerySet.as_manager()
+
     class Meta:
         """Russian translate."""
 
@@ -44,10 +55,18 @@ class Location(PublishedTimeModel):
         return self.name[:TITLE_TEXT_SLICE]
 
 
-class Post(PublishedTimeModel, TitleModel):
+class Post(
+    PublishedTimeModel, TitleModel, LoadedStateModel, RenderedTextModel
+):
     """Post model."""
 
     text = models.TextField('Текст')
+    excerpt = models.TextField(
+        'Начало текста',
+        blank=True,
+        editable=False,
+        help_text='Первые слова текста для ленты, обновляется само.'
+    )
     image = models.ImageField(
         'Изображение',
         upload_to='images/posts/%Y/%m/%d/',
@@ -76,18 +95,72 @@ class Post(PublishedTimeModel, TitleModel):
         null=True,
         verbose_name='Категория',
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+        help_text='Число опубликованных комментариев, обновляется само.'
+    )
+    is_visible = models.BooleanField(
+        'Видна всем',
+        default=False,
+        editable=False,
+        help_text=('Опубликована сама публикация и её категория, '
+                   'и наступили дата и время публикации.')
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True,
+        help_text='Время изменения публикации или её комментариев.'
+    )
+
+    objects = CachedQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_visible_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx'
+            ),
+        )
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={"post_id": self.pk})
 
+    def save(self, *args, **kwargs):
+        self.is_visible = bool(
+            self.is_published
+            and self.category
+            and self.category.is_published
+            and self.pub_date <= timezone.now()
+        )
+        self.excerpt = Truncator(self.text).words(EXCERPT_WORDS, truncate=' …')
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'is_visible', 'excerpt', 'updated_at'
+            }
+        super().save(*args, **kwargs)
+
+
+class Comment(PublishedTimeModel, LoadedStateModel, RenderedTextModel):
+    """Comment model.
 
-class Comment(PublishedTimeModel):
-    """Comment model."""
+    Saving and deleting run in a transaction, so the row and the
+    ``Post.comment_count`` recounted by ``blog.signals`` commit together.
+    """
 
     post = models.ForeignKey(
         Post,
@@ -102,6 +175,8 @@ class Comment(PublishedTimeModel):
     )
     text = models.TextField('Текст комментария')
 
+    objects = CachedQuerySet.as_manager()
+
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'комментарий'
@@ -113,3 +188,11 @@ class Comment(PublishedTimeModel):
             f'к посту "{self.post}",\n'
             f'текст: "{self.text[:COMMENT_TEXT_SLICE]}..."'
         )
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,244 @@
+"""Full-page cache for anonymous readers, purged by tags.
+
+Every cached page remembers the versions of its tags, e.g. ``feed:index``
+or ``post:42``, read before the view reads the data they guard. Purging
+a tag drops its version, now and again once the transaction commits, so
+all pages rendered with it stop matching and are rendered again on the
+next hit. Post card fragments are keyed by the version of the
+``post:<id>`` tag as well.
+
+Pages outlive ``PAGE_CACHE_TIMEOUT`` by ``PAGE_STALE_TIMEOUT``: an
+expired page is still served while it is rendered again after the
+response, and a purged one is served if rendering it fails on the
+database or the cache (``RENDER_ERRORS``).
+While one worker renders a page, the others get the previous copy or
+wait briefly for the new one. Not found pages are cached briefly under
+the tags from ``get_not_found_tags()``, so creating or publishing what
+was missing purges them.
+
+Rendered pages carry an ``ETag`` (a hash of the content) and a
+``Last-Modified`` (the render time). A conditional GET is answered
+with 304 from the cached entry alone, while its tags are current.
+Pages personal to a logged in reader are not cached, but their
+validators are, under the path, the reader and the CSRF cookie.
+
+Cached pages also name their tags in a ``Surrogate-Key`` header for the
+HTTP cache in front of the app, purged along with them (``blog.edge``).
+"""
+import sqlite3
+import time
+from hashlib import md5
+from http import HTTPStatus
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import edge, locks
+from .constants import (
+    EDGE_CACHE_TIMEOUT,
+    NOT_FOUND_TIMEOUT,
+    PAGE_CACHE_TIMEOUT,
+    PAGE_STALE_TIMEOUT,
+    PAGE_TAG_TIMEOUT)
+from .utils import again_on_commit
+
+# The database and the SQLite cache (``core.cache``) fail with these.
+RENDER_ERRORS = (DatabaseError, sqlite3.Error)
+
+FRESH = 'fresh'
+EXPIRED = 'expired'
+PURGED = 'purged'
+
+
+def get_page_key(path: str) -> str:
+    return f'blog:page:{md5(path.encode()).hexdigest()}'
+
+
+def get_tag_key(tag: str) -> str:
+    return f'blog:page-tag:{tag}'
+
+
+def get_validators_key(path: str, variant: str) -> str:
+    key = md5(f'{path}\n{variant}'.encode()).hexdigest()
+    return f'blog:page-validators:{key}'
+
+
+class RevalidatingResponse(HttpResponse):
+    """Stale page; ``revalidate()`` runs once the response is sent.
+
+    The page is rendered again in the request worker, after the client
+    has the body: the worker and its database connection stay busy for
+    one more render, but no reader waits for it, and no view runs
+    outside its request.
+    """
+
+    def __init__(self, *args, revalidate, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.revalidate = revalidate
+
+    def close(self):
+        try:
+            self.revalidate()
+        finally:
+            super().close()
+
+
+def get_cached_page(path: str):
+    """Entry cached for the path with its state, or None.
+
+    The state is ``FRESH``, ``EXPIRED`` when the timeout has run out, or
+    ``PURGED`` when a tag of the page has been purged since.
+    """
+    entry = cache.get(get_page_key(path))
+    if entry is None:
+        return None
+    if not tags_current(entry['tags']):
+        return entry, PURGED
+    if entry['expires'] <= time.time():
+        return entry, EXPIRED
+    return entry, FRESH
+
+
+def tags_current(tags: dict) -> bool:
+    """Whether none of the tags was purged since the versions were read."""
+    versions = cache.get_many(get_tag_key(tag) for tag in tags)
+    return all(
+        versions.get(get_tag_key(tag)) == version
+        for tag, version in tags.items()
+    )
+
+
+def get_validators(content: bytes) -> dict:
+    return {
+        'etag': quote_etag(md5(content).hexdigest()),
+        'last_modified': int(time.time()),
+    }
+
+
+def set_cache_headers(response, entry):
+    """Validators and surrogate keys of the entry."""
+    if entry.get('etag'):
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+    if entry.get('surrogate_keys'):
+        response['Surrogate-Key'] = ' '.join(entry['surrogate_keys'])
+        response['Surrogate-Control'] = f'max-age={entry["edge_timeout"]}'
+    return response
+
+
+def get_not_modified(request, entry):
+    """304 response if the reader's copy matches the entry, or None."""
+    if not entry.get('etag'):
+        return None
+    return get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=entry['last_modified']
+    )
+
+
+def get_page_response(entry, revalidate=None) -> HttpResponse:
+    if revalidate is None:
+        response = HttpResponse(
+            entry['content'],
+            content_type=entry['content_type'],
+            status=entry['status']
+        )
+    else:
+        response = RevalidatingResponse(
+            entry['content'],
+            content_type=entry['content_type'],
+            status=entry['status'],
+            revalidate=revalidate
+        )
+    return set_cache_headers(response, entry)
+
+
+def get_stale_response(entry, revalidate=None) -> HttpResponse:
+    """Expired or purged page, kept out of the HTTP cache in front."""
+    response = get_page_response(entry, revalidate)
+    response['Surrogate-Control'] = 'no-store'
+    return response
+
+
+def lock_page(path: str) -> bool:
+    """Whether this worker is the one to render the page."""
+    return locks.acquire(get_page_key(path))
+
+
+def unlock_page(path: str):
+    locks.release(get_page_key(path))
+
+
+def wait_for_page(path: str):
+    """Fresh entry rendered meanwhile by the worker holding the lock."""
+    def get_fresh():
+        cached = get_cached_page(path)
+        if cached is not None and cached[1] == FRESH:
+            return cached[0]
+        return None
+    return locks.wait_for(get_fresh)
+
+
+def get_tag_versions(tags) -> dict:
+    """Current versions of the tags, new ones for tags without a version."""
+    keys = {get_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        version = uuid4().hex
+        if not cache.add(key, version, PAGE_TAG_TIMEOUT):
+            version = cache.get(key, version)
+        versions[key] = version
+    return {tag: versions[key] for key, tag in keys.items()}
+
+
+def cache_page(path: str, response, tags: dict):
+    """Keep the rendered response under the tag versions read before it.
+
+    Not found pages are kept for ``NOT_FOUND_TIMEOUT`` only, without
+    validators, and are never served stale.
+    """
+    entry = {
+        'tags': tags,
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'status': response.status_code,
+    }
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        timeout, stale_timeout = NOT_FOUND_TIMEOUT, 0
+        entry['edge_timeout'] = NOT_FOUND_TIMEOUT
+    else:
+        timeout, stale_timeout = PAGE_CACHE_TIMEOUT, PAGE_STALE_TIMEOUT
+        entry['edge_timeout'] = EDGE_CACHE_TIMEOUT
+        entry.update(get_validators(response.content))
+    entry['surrogate_keys'] = edge.get_surrogate_keys(entry['tags'])
+    set_cache_headers(response, entry)
+    entry['expires'] = time.time() + timeout
+    cache.set(get_page_key(path), entry, timeout + stale_timeout)
+
+
+def get_current_validators(path: str, variant: str):
+    """Validators of a personal page while its tags are current, or None."""
+    entry = cache.get(get_validators_key(path, variant))
+    if entry is None or not tags_current(entry['tags']):
+        return None
+    return entry
+
+
+def cache_validators(path: str, variant: str, response, tags: dict):
+    """Keep the validators of a rendered personal page, without content."""
+    entry = {'tags': tags, **get_validators(response.content)}
+    cache.set(get_validators_key(path, variant), entry, PAGE_CACHE_TIMEOUT)
+    set_cache_headers(response, entry)
+
+
+def purge_tags(*tags):
+    """Expire every cached page rendered with any of the tags."""
+    again_on_commit(lambda: cache.delete_many(
+        [get_tag_key(tag) for tag in tags]
+    ))
+    edge.purge_tags(*tags)
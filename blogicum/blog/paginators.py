@@ -0,0 +1,169 @@
+"""Paginators for post feeds."""
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .constants import (
+    FEED_COUNT_APPROXIMATE_THRESHOLD,
+    FEED_COUNT_APPROXIMATE_TIMEOUT,
+    FEED_COUNT_TIMEOUT)
+from .locks import get_or_compute
+
+
+class InvalidCursor(ValueError):
+    """Cursor from the query string can not be parsed."""
+
+
+def encode_cursor(post) -> str:
+    """Cursor of the post in ``<pub_date,id>`` form."""
+    return f'{post.pub_date.isoformat()},{post.pk}'
+
+
+def decode_cursor(cursor: str):
+    """Parse ``<pub_date,id>`` cursor into an aware datetime and an id."""
+    try:
+        raw_date, raw_pk = cursor.rsplit(',', 1)
+        pub_date = parse_datetime(raw_date)
+        pk = int(raw_pk)
+    except ValueError:
+        raise InvalidCursor(cursor)
+    if pub_date is None:
+        raise InvalidCursor(cursor)
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date, pk
+
+
+class CursorPage(Sequence):
+    """One page of a feed addressed by cursors instead of numbers."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} posts>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+class CursorPaginator:
+    """Keyset paginator over a feed ordered by ``-pub_date, -pk``.
+
+    A page is fetched by seeking past the cursor on the feed index, so
+    the cost does not depend on how deep the page is, and links stay
+    valid when newer posts are published.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    def get_page(self, after=None, before=None) -> CursorPage:
+        """Page older than ``after`` or newer than ``before``.
+
+        Without cursors the first (newest) page is returned. Raises
+        ``InvalidCursor`` for a malformed cursor.
+        """
+        if before:
+            pub_date, pk = decode_cursor(before)
+            posts = list(
+                self.queryset.filter(pub_date__gte=pub_date).exclude(
+                    pub_date=pub_date, pk__lte=pk
+                ).order_by('pub_date', 'pk')[:self.per_page + 1]
+            )
+            has_previous = len(posts) > self.per_page
+            posts = posts[:self.per_page][::-1]
+            return CursorPage(posts, has_next=True, has_previous=has_previous)
+
+        queryset = self.queryset.order_by('-pub_date', '-pk')
+        if after:
+            pub_date, pk = decode_cursor(after)
+            queryset = queryset.filter(pub_date__lte=pub_date).exclude(
+                pub_date=pub_date, pk__gte=pk
+            )
+        posts = list(queryset[:self.per_page + 1])
+        return CursorPage(
+            posts[:self.per_page],
+            has_next=len(posts) > self.per_page,
+            has_previous=bool(after)
+        )
+
+
+def get_feed_count_key(feed: str) -> str:
+    return f'blog:feed-count:{feed}'
+
+
+def invalidate_feed_counts(*feeds):
+    """Drop cached counts of the feeds.
+
+    Counts at or above ``FEED_COUNT_APPROXIMATE_THRESHOLD`` are kept until
+    their own short timeout: one post more or less does not change the
+    page count of such a feed in a way readers notice.
+    """
+    keys = [get_feed_count_key(feed) for feed in feeds]
+    cached = cache.get_many(keys)
+    cache.delete_many([
+        key for key in keys
+        if cached.get(key, 0) < FEED_COUNT_APPROXIMATE_THRESHOLD
+    ])
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator keeping the total count of a feed in the cache.
+
+    Deep pages then run only the page query itself. Cached counts are
+    dropped by ``blog.signals`` when posts of the feed change, and one
+    worker at a time counts a feed again.
+    """
+
+    def __init__(self, *args, feed=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.feed = feed
+
+    @cached_property
+    def count(self):
+        if self.feed is None:
+            return super().count
+        return get_or_compute(
+            get_feed_count_key(self.feed),
+            lambda: super(CachedCountPaginator, self).count,
+            lambda count: (
+                FEED_COUNT_APPROXIMATE_TIMEOUT
+                if count >= FEED_COUNT_APPROXIMATE_THRESHOLD
+                else FEED_COUNT_TIMEOUT
+            )
+        )
@@ -0,0 +1,87 @@
+"""In-process registry of categories and locations.
+
+Both tables are tiny and change rarely, so every worker keeps them in
+memory and feed queries do not join them. A version stamp in the
+default cache tells the workers when to reload: ``blog.signals``
+drops it whenever a category or a location is saved or deleted.
+
+Other workers see the new stamp only if the default cache is shared
+between them, as the SQLite backend of ``settings.CACHES`` is. With a
+per-process cache such as LocMem each worker reloads only on its own
+writes, and otherwise after ``REFERENCES_VERSION_TIMEOUT``.
+"""
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from .constants import REFERENCES_VERSION_TIMEOUT
+from .models import Category, Location, Post
+
+REFERENCES_VERSION_KEY = 'blog:references-version'
+
+
+def bump_references_version():
+    """Make every worker reload the registry on its next access.
+
+    The stamp is dropped rather than replaced, the next access adds a new
+    one, so in-process copies of the stamp are retired as well.
+    """
+    cache.delete(REFERENCES_VERSION_KEY)
+
+
+class ReferenceRegistry:
+    """Categories by id and slug, locations by id, loaded lazily."""
+
+    def __init__(self):
+        self._version = None
+        self._data = ({}, {}, {})
+
+    def _load(self):
+        version = cache.get(REFERENCES_VERSION_KEY)
+        if version is None:
+            version = uuid4().hex
+            if not cache.add(
+                    REFERENCES_VERSION_KEY, version,
+                    REFERENCES_VERSION_TIMEOUT):
+                version = cache.get(REFERENCES_VERSION_KEY, version)
+        if version != self._version:
+            categories = {
+                category.pk: category for category in Category.objects.all()
+            }
+            self._data = (
+                categories,
+                {category.slug: category for category in categories.values()},
+                {location.pk: location for location in Location.objects.all()},
+            )
+            self._version = version
+        return self._data
+
+    def get_category(self, pk):
+        return self._load()[0].get(pk)
+
+    def get_category_by_slug(self, slug):
+        return self._load()[1].get(slug)
+
+    def get_location(self, pk):
+        return self._load()[2].get(pk)
+
+    def attach(self, posts):
+        """Set ``category`` and ``location`` of the posts from memory.
+
+        Posts with a relation missing from the registry load it lazily.
+        """
+        categories, _, locations = self._load()
+        category_field = Post._meta.get_field('category')
+        location_field = Post._meta.get_field('location')
+        for post in posts:
+            for field, objects in (
+                (category_field, categories),
+                (location_field, locations),
+            ):
+                pk = getattr(post, field.attname)
+                if pk is None or pk in objects:
+                    field.set_cached_value(post, objects.get(pk))
+        return posts
+
+
+references = ReferenceRegistry()
@@ -0,0 +1,38 @@
+"""Publication of deferred posts."""
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import Post
+from .signals import post_published
+
+
+def get_scheduled_posts() -> QuerySet:
+    """Published posts in published categories that are not live yet."""
+    return Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True
+    )
+
+
+def get_next_pub_date():
+    """Nearest pub_date of a scheduled post or None."""
+    return get_scheduled_posts().filter(
+        pub_date__gt=timezone.now()
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+
+
+def publish_due_posts() -> list:
+    """Make scheduled posts with a past pub_date visible.
+
+    ``post_published`` is sent for every post that went live.
+    """
+    due_posts = get_scheduled_posts().filter(pub_date__lte=timezone.now())
+    posts = list(due_posts)
+    due_posts.filter(pk__in=[post.pk for post in posts]).update(
+        is_visible=True
+    )
+    for post in posts:
+        post.is_visible = True
+        post_published.send(sender=Post, instance=post)
+    return posts
@@ -0,0 +1,136 @@
+"""Receivers keeping denormalized blog data in sync."""
+from django.db.models import Case, Count, OuterRef, Subquery, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .feeds import invalidate_feeds, invalidate_posts
+from .pagecache import purge_tags
+from .models import Category, Comment, Location, Post, User
+from .registry import bump_references_version
+from .utils import (
+    again_on_commit,
+    forget_missing,
+    forget_username,
+    get_category_feeds,
+    get_post_feeds)
+
+post_published = Signal()
+"""Sent with ``instance`` when a deferred post goes live at its pub_date."""
+
+
+def update_comment_count(*post_ids):
+    """Recount published comments of the posts in a single UPDATE.
+
+    The posts count as modified, comments have no timestamp of their own.
+    """
+    published_comments = Comment.objects.filter(
+        post=OuterRef('pk'),
+        is_published=True
+    ).order_by().values('post').annotate(count=Count('pk')).values('count')
+    Post.objects.filter(pk__in=post_ids).update(
+        comment_count=Coalesce(Subquery(published_comments), 0),
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, **kwargs):
+    post_ids = {instance.post_id, instance.get_loaded_value('post_id')}
+    post_ids.discard(None)
+    update_comment_count(*post_ids)
+    invalidate_posts(*post_ids)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    update_comment_count(instance.post_id)
+    invalidate_posts(instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_published, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    invalidate_feeds(*get_post_feeds(instance))
+    invalidate_posts(instance.pk)
+    forget_missing(f'post:{instance.pk}')
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if not created and (
+        instance.get_loaded_value('is_published') != instance.is_published
+    ):
+        instance.posts.update(is_visible=Case(
+            When(
+                is_published=True,
+                pub_date__lte=timezone.now(),
+                then=instance.is_published
+            ),
+            default=False
+        ))
+        if instance.is_published:
+            # The posts were hidden with the category until now.
+            forget_missing(*(
+                f'post:{pk}' for pk in instance.posts.filter(
+                    is_visible=True).values_list('pk', flat=True)
+            ))
+    invalidate_feeds(*get_category_feeds(instance))
+    invalidate_posts(*instance.posts.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    instance.posts.update(is_visible=False)
+    invalidate_feeds(*get_category_feeds(instance))
+    invalidate_posts(*instance.posts.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    invalidate_posts(*instance.posts.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def references_changed(sender, **kwargs):
+    bump_references_version()
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored username, cached ids are keyed by it."""
+    instance._stored_username = None
+    if instance.pk is not None and (
+        update_fields is None or 'username' in update_fields
+    ):
+        instance._stored_username = User.objects.filter(
+            pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    old_username = getattr(instance, '_stored_username', None)
+    if old_username not in (None, instance.username):
+        again_on_commit(lambda: forget_username(old_username))
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    forget_missing(f'user:{instance.username}')
+    purge_tags(f'username:{instance.username}')
+    invalidate_posts(*instance.posts.values_list('pk', flat=True))
+    purge_tags(f'user:{instance.pk}')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    forget_username(instance.username)
+    purge_tags(f'user:{instance.pk}')
@@ -43,5 +43,9 @@ urlpatterns = [
 
     path('posts/', include(posts_urls)),
 
-    path('profile/', include(profile_urls))
+    path('profile/', include(profile_urls)),
+
+    path('fragments/',
+         views.UserFragmentsView.as_view(),
+         name='user_fragments'),
 ]
@@ -1,9 +1,12 @@
-from datetime import datetime
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.http import Http404
 
-from django.db.models import Count, QuerySet
-from django.shortcuts import get_object_or_404
+from .constants import NOT_FOUND_TIMEOUT, USER_ID_CACHE_TIMEOUT
+from .models import Category, Post, User
 
-from .models import Post
+PUBLIC_USER_FIELDS = ('id', 'username')
 
 
 def get_all_posts() -> QuerySet:
@@ -13,28 +16,128 @@ def get_all_posts() -> QuerySet:
     )
 
 
-def get_detailed_post(post_id: int) -> Post:
-    """Filter of one post."""
-    return get_object_or_404(
-        get_all_posts(),
-        pk=post_id,
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=datetime.now()
-    )
+def get_readable_posts(user) -> QuerySet:
+    """Posts visible to everyone plus, for a logged in user, their own."""
+    readable = Q(is_visible=True)
+    if user.is_authenticated:
+        readable |= Q(author=user)
+    return get_all_posts().filter(readable)
+
+
+def defer_private_author(queryset: QuerySet) -> QuerySet:
+    """Load only the public fields of the joined ``author``.
+
+    Rows of such querysets are kept in the shared cache, so passwords and
+    emails must not come with them.
+    """
+    return queryset.defer(*(
+        f'author__{field.attname}' for field in User._meta.concrete_fields
+        if field.attname not in PUBLIC_USER_FIELDS
+    ))
 
 
-def add_annotate_ordering():
-    """Add annotate and date sorting to all posts."""
-    return get_all_posts().annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date')
+def get_listed_posts() -> QuerySet:
+    """Posts for lists: the full text is deferred, cards show the excerpt.
+
+    Categories and locations are not joined, list views attach them
+    from ``blog.registry``.
+    """
+    return defer_private_author(
+        Post.objects.select_related('author').defer('text'))
+
+
+def add_ordering() -> QuerySet:
+    """Add date sorting to listed posts."""
+    return get_listed_posts().order_by('-pub_date', '-pk')
 
 
 def get_posts() -> QuerySet:
-    """Filtered posts by date and published."""
-    return add_annotate_ordering().filter(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=datetime.now()
+    """Posts visible to everyone."""
+    return add_ordering().filter(is_visible=True)
+
+
+def get_user_id_key(username: str) -> str:
+    return f'blog:user-id:{username}'
+
+
+def get_missing_key(lookup: str) -> str:
+    return f'blog:missing:{lookup}'
+
+
+def is_missing(lookup: str) -> bool:
+    """Whether the lookup, e.g. ``post:42``, found nothing a moment ago."""
+    return cache.get(get_missing_key(lookup)) is not None
+
+
+def remember_missing(lookup: str):
+    cache.set(get_missing_key(lookup), True, NOT_FOUND_TIMEOUT)
+
+
+def forget_missing(*lookups):
+    """Drop not found results once a matching object appears."""
+    cache.delete_many([get_missing_key(lookup) for lookup in lookups])
+
+
+def get_user_id(username: str) -> int:
+    """Id of the user with the username, cached; Http404 if there is none.
+
+    A missing username is remembered for ``NOT_FOUND_TIMEOUT``.
+    """
+    key = get_user_id_key(username)
+    user_id = cache.get(key)
+    if user_id is None:
+        if is_missing(f'user:{username}'):
+            raise Http404('Пользователь не найден.')
+        user_id = User.objects.filter(
+            username=username).values_list('pk', flat=True).first()
+        if user_id is None:
+            remember_missing(f'user:{username}')
+            raise Http404('Пользователь не найден.')
+        cache.set(key, user_id, USER_ID_CACHE_TIMEOUT)
+    return user_id
+
+
+def forget_username(username: str):
+    """Drop the cached id of the username after it changes or is deleted."""
+    cache.delete(get_user_id_key(username))
+
+
+def get_author_feeds(*author_ids) -> set:
+    feeds = set()
+    for author_id in author_ids:
+        feeds.update((f'author:{author_id}', f'author:{author_id}:all'))
+    return feeds
+
+
+def get_post_feeds(post: Post) -> set:
+    """Names of the feeds the post is or was listed in."""
+    category_ids = {
+        post.category_id, post.get_loaded_value('category_id')} - {None}
+    feeds = {'index'}
+    feeds.update(
+        f'category:{slug}' for slug in Category.objects.filter(
+            pk__in=category_ids).values_list('slug', flat=True)
     )
+    feeds.update(get_author_feeds(
+        post.author_id, *{post.get_loaded_value('author_id')} - {None}
+    ))
+    return feeds
+
+
+def get_category_feeds(category: Category) -> set:
+    """Names of the feeds listing posts of the category."""
+    feeds = {'index', f'category:{category.slug}'}
+    feeds.update(get_author_feeds(*category.posts.order_by().values_list(
+        'author_id', flat=True).distinct()))
+    return feeds
+
+
+def again_on_commit(drop):
+    """Run ``drop()`` now and again once the transaction commits.
+
+    The signals invalidate inside the writer's transaction, so a reader
+    in between may cache the old rows again.
+    """
+    drop()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(drop)
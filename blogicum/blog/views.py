@@ -1,10 +1,15 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views.decorators.cache import never_cache
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
+    TemplateView,
     UpdateView)
 
 from .forms import CommentForm, PostForm
@@ -12,9 +17,18 @@ from .mixins import (
     CommentMixin,
     CommentUpDelMixin,
     ListPostMixin,
+    PageCacheMixin,
     UpDelPostMixin)
-from .models import Category, Post, User
-from .utils import add_annotate_ordering, get_detailed_post, get_posts
+from .models import Comment, Post, User
+from .registry import references
+from .utils import (
+    add_ordering,
+    defer_private_author,
+    get_posts,
+    get_readable_posts,
+    get_user_id,
+    is_missing,
+    remember_missing)
 
 
 class PostListView(ListPostMixin):
@@ -28,41 +42,80 @@ class CategoryPostsView(ListPostMixin):
 
     template_name = 'blog/category.html'
 
+    @cached_property
+    def category(self):
+        category = references.get_category_by_slug(
+            self.kwargs['category_slug']
+        )
+        if category is None or not category.is_published:
+            raise Http404('Категория не найдена.')
+        return category
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category,
-            is_published=True,
-            slug=self.kwargs['category_slug']
-        )
+        context['category'] = self.category
         return context
 
     def get_queryset(self):
-        return get_posts().filter(
-            category__slug=self.kwargs['category_slug']
-        )
+        return get_posts().filter(category_id=self.category.pk)
 
+    def get_feed(self):
+        return f'category:{self.kwargs["category_slug"]}'
 
-class PostDetailView(DetailView):
+
+class PostDetailView(PageCacheMixin, DetailView):
     """Page with detailed post."""
 
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return get_readable_posts(self.request.user)
+
     def get_object(self, queryset=None):
-        """Check post page by demands."""
-        post = super().get_object(queryset)
-        if self.request.user != post.author:
-            post = get_detailed_post(self.kwargs['post_id'])
-        return post
+        # Not found results are only remembered for posts nobody but the
+        # author could see.
+        lookup = f'post:{self.kwargs["post_id"]}'
+        anonymous = not self.request.user.is_authenticated
+        if anonymous and is_missing(lookup):
+            raise Http404('Публикация не найдена.')
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            if anonymous:
+                remember_missing(lookup)
+            raise
+
+    def get_page_tags(self):
+        return {f'post:{self.object.pk}'}
+
+    def get_not_found_tags(self):
+        return {f'post:{self.kwargs["post_id"]}'}
+
+    def get_known_tags(self):
+        return {f'post:{self.kwargs["post_id"]}'}
+
+    def is_page_shared(self):
+        # Only posts everyone can read; before the post is loaded, a
+        # cached page served to a logged in reader can only be one of
+        # those, as not found pages are not (see ``can_serve()``).
+        return super().is_page_shared() and (
+            not hasattr(self, 'object') or self.object.is_visible
+        )
+
+    def get_fragments_url(self):
+        return f'{super().get_fragments_url()}?post={self.kwargs["post_id"]}'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        ).order_by('created_at')
+        context['comments'] = Comment.prefetch_text_html(list(
+            defer_private_author(
+                Comment.objects.filter(post_id=self.object.pk).select_related(
+                    'author').order_by('created_at')
+            ).cache()
+        ))
         return context
 
 
@@ -93,33 +146,75 @@ class PostDeleteView(UpDelPostMixin, DeleteView):
     def get_success_url(self):
         return reverse('blog:profile', args=(self.request.user,))
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['post'] = self.get_object()
-        return context
-
 
 class ProfileView(ListPostMixin):
     """User profile with information and his posts."""
 
     template_name = 'blog/profile.html'
 
+    @cached_property
+    def author_id(self):
+        return get_user_id(self.kwargs['username'])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User,
-            username=self.kwargs['username'])
+        context['profile'] = get_object_or_404(User, pk=self.author_id)
         return context
 
+    def get_page_tags(self):
+        return {*super().get_page_tags(), f'user:{self.author_id}'}
+
+    def get_known_tags(self):
+        # Read before the username is looked up, in case it is missing.
+        self.read_tag_versions({f'username:{self.kwargs["username"]}'})
+        return {*super().get_known_tags(), f'user:{self.author_id}'}
+
+    def is_page_shared(self):
+        return super().is_page_shared() and not self.is_own_profile()
+
+    def get_not_found_tags(self):
+        try:
+            return super().get_not_found_tags()
+        except Http404:
+            return {f'username:{self.kwargs["username"]}'}
+
+    def is_own_profile(self):
+        return self.request.user.get_username() == self.kwargs['username']
+
+    def get_feed(self):
+        if self.is_own_profile():
+            return f'author:{self.author_id}:all'
+        return f'author:{self.author_id}'
+
     def get_queryset(self):
-        if self.request.user.username == self.kwargs['username']:
-            return add_annotate_ordering().filter(
-                author__username=self.kwargs['username']
-            )
-        else:
-            return get_posts().filter(
-                author__username=self.kwargs['username']
-            )
+        if self.is_own_profile():
+            return add_ordering().filter(author_id=self.author_id)
+        return get_posts().filter(author_id=self.author_id)
+
+
+@method_decorator(never_cache, name='dispatch')
+class UserFragmentsView(TemplateView):
+    """Parts of a shared page rendered for the reader.
+
+    The header buttons and, for ``?post=<id>``, the edit links and the
+    comment form of the post.
+    """
+
+    template_name = 'includes/user_fragments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        post_id = self.request.GET.get('post', '')
+        if post_id.isdigit():
+            post = get_readable_posts(self.request.user).filter(
+                pk=post_id).first()
+            context['post'] = post
+            if post is not None and self.request.user.is_authenticated:
+                context['form'] = CommentForm()
+                context['own_comments'] = post.comments.filter(
+                    author=self.request.user
+                )
+        return context
 
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
@@ -67,6 +67,41 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TwoTierCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'NAMESPACES': {
+                'posts': [
+                    'blog:post:',
+                    'blog:feed-ids:',
+                    'blog:feed-count:',
+                ],
+                'page-tags': ['blog:page-tag:'],
+                'post-cards': ['template.cache.post_card.'],
+                'categories': ['blog:references-version'],
+                'query-tables': ['querycache:table:'],
+                'queries': ['querycache:'],
+            },
+            'L1_MAX_ENTRIES': 1000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache.sqlite3',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+            'MAX_SIZE': 256 * 2 ** 20,
+        },
+    },
+}
+
+# HTTP caches in front of the app, purged by surrogate keys (blog.edge):
+# [{'BACKEND': 'blog.edge.HttpPurger',
+#   'OPTIONS': {'url': 'http://127.0.0.1:6081/'}}]
+EDGE_PURGERS = []
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
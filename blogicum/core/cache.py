@@ -0,0 +1,475 @@
+"""Cache backend in a local SQLite file shared by the workers of a host.
+
+The file is opened in WAL mode, so readers do not wait for a writer.
+Entries are evicted least recently used first once ``MAX_ENTRIES`` or
+the optional ``MAX_SIZE`` (bytes of values) is exceeded. Every write
+runs in an immediate transaction, so ``add()`` and ``incr()`` are atomic
+across the workers; integers are stored unpickled.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 100_000, 'MAX_SIZE': 256 * 2 ** 20},
+        }
+    }
+
+``TwoTierCache`` puts an in-process LRU (L1) in front of such a shared
+cache (L2). Keys are grouped into namespaces by prefix, and deleting or
+incrementing a key of a namespace increments its version counter in
+L2. An L1 copy is served only while the counter still has the value it
+was stored with; the counters are read with one request per HTTP
+request, so an invalidation in one worker retires the L1 copies of all
+workers without broadcasting.
+
+Filling a key does not touch the counter, so namespaces are only for
+keys that are never overwritten in place: each value is either
+immutable (e.g. keyed by a version) or deleted before it is replaced.
+Keys outside the namespaces, like locks and page entries, always go to
+L2.
+"""
+import os
+import pickle
+import random
+import sqlite3
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import request_started
+
+# Reads refresh the LRU position of an entry at most this often, so that
+# hot keys do not turn every read into a write.
+ACCESS_RESOLUTION = 10
+
+INT64 = range(-2 ** 63, 2 ** 63)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats VALUES (1, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats
+    SET entries = entries + 1, size = size + length(new.value);
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF value ON cache BEGIN
+    UPDATE cache_stats
+    SET size = size + length(new.value) - length(old.value);
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats
+    SET entries = entries - 1, size = size - length(old.value);
+END;
+'''
+
+UPSERT = '''
+INSERT INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value,
+    expires = excluded.expires,
+    accessed = excluded.accessed
+'''
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        options = params.get('OPTIONS', {})
+        self._max_size = options.get('MAX_SIZE')
+        self._busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # A connection must not cross a fork of the worker process.
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self._path,
+                timeout=self._busy_timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.executescript(SCHEMA)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _encode(self, value):
+        if type(value) is int and value in INT64:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _write(self, statements):
+        """Run ``(sql, params)`` statements in one write transaction."""
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            changes = [
+                connection.execute(sql, params).rowcount
+                for sql, params in statements
+            ]
+            self._cull(connection)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return changes
+
+    def _cull(self, connection):
+        entries, size = connection.execute(
+            'SELECT entries, size FROM cache_stats').fetchone()
+        if entries <= self._max_entries and (
+            self._max_size is None or size <= self._max_size
+        ):
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        while True:
+            entries, size = connection.execute(
+                'SELECT entries, size FROM cache_stats').fetchone()
+            if entries <= self._max_entries and (
+                self._max_size is None or size <= self._max_size
+            ):
+                return
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache')
+                return
+            connection.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (max(1, entries // self._cull_frequency),)
+            )
+
+    def _get_rows(self, keys) -> dict:
+        now = time.time()
+        rows = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows.update(
+                (key, (value, accessed))
+                for key, value, accessed in self.connection.execute(
+                    'SELECT key, value, accessed FROM cache'
+                    f' WHERE key IN ({", ".join("?" * len(chunk))})'
+                    ' AND (expires IS NULL OR expires > ?)',
+                    (*chunk, now)
+                )
+            )
+        touched = [
+            key for key, (_, accessed) in rows.items()
+            if accessed < now - ACCESS_RESOLUTION
+        ]
+        if touched:
+            self.connection.execute(
+                'UPDATE cache SET accessed = ?'
+                f' WHERE key IN ({", ".join("?" * len(touched))})',
+                (now, *touched)
+            )
+        return {key: value for key, (value, _) in rows.items()}
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        rows = self._get_rows([key])
+        if key not in rows:
+            return default
+        return self._decode(rows[key])
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_key(key, version=version): key for key in keys}
+        for key in keys:
+            self.validate_key(key)
+        return {
+            keys[key]: self._decode(value)
+            for key, value in self._get_rows(list(keys)).items()
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        statements = []
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            statements.append(
+                (UPSERT, (key, self._encode(value), expires, now))
+            )
+        if statements:
+            self._write(statements)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        now = time.time()
+        [changed] = self._write([(
+            UPSERT + ' WHERE cache.expires <= ?',
+            (key, self._encode(value), self.get_backend_timeout(timeout),
+             now, now)
+        )])
+        return bool(changed)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        [changed] = self._write([(
+            'UPDATE cache SET expires = ? WHERE key = ?'
+            ' AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time())
+        )])
+        return bool(changed)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT value FROM cache WHERE key = ?'
+                ' AND (expires IS NULL OR expires > ?)',
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = self._decode(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (self._encode(value), key)
+            )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self.connection.execute(
+            'SELECT 1 FROM cache WHERE key = ?'
+            ' AND (expires IS NULL OR expires > ?)',
+            (key, time.time())
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        [deleted] = self._write([('DELETE FROM cache WHERE key = ?', (key,))])
+        return bool(deleted)
+
+    def delete_many(self, keys, version=None):
+        statements = []
+        for key in keys:
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            statements.append(('DELETE FROM cache WHERE key = ?', (key,)))
+        if statements:
+            self._write(statements)
+
+    def clear(self):
+        self._write([('DELETE FROM cache', ())])
+
+
+class TwoTierCache(BaseCache):
+    """In-process LRU in front of the cache named by the ``L2`` option.
+
+        'OPTIONS': {
+            'L2': 'shared',
+            'NAMESPACES': {'posts': ['blog:post:'], ...},
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 60,
+            'VERSIONS_TIMEOUT': 1,
+        }
+
+    ``L1_TIMEOUT`` bounds how long an L1 copy may outlive its L2 entry.
+    Counters read at the start of a request are trusted until the next
+    one, or for ``VERSIONS_TIMEOUT`` seconds outside the requests.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options['L2']
+        self._prefixes = sorted(
+            (
+                (prefix, namespace)
+                for namespace, prefixes in options.get(
+                    'NAMESPACES', {}).items()
+                for prefix in prefixes
+            ),
+            key=lambda item: -len(item[0])
+        )
+        self._versions_timeout = options.get('VERSIONS_TIMEOUT', 1)
+        # Instances of one location share the LRU of the process.
+        self._l1 = LocMemCache(f'two-tier:{location}', {
+            'TIMEOUT': options.get('L1_TIMEOUT', 60),
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000)
+            },
+        })
+        self._versions = None
+        self._versions_read = 0
+        request_started.connect(self._forget_versions)
+
+    @property
+    def l2(self) -> BaseCache:
+        return caches[self._l2_alias]
+
+    def _forget_versions(self, **kwargs):
+        self._versions = None
+
+    def get_namespace(self, key):
+        key = str(key)
+        for prefix, namespace in self._prefixes:
+            if key.startswith(prefix):
+                return namespace
+        return None
+
+    @staticmethod
+    def get_version_key(namespace: str) -> str:
+        return f'two-tier-version:{namespace}'
+
+    def _new_counter(self, namespace):
+        """Start a missing counter at a random value.
+
+        A counter evicted and created again must not repeat the values
+        that stale L1 copies were stored with.
+        """
+        key = self.get_version_key(namespace)
+        self.l2.add(key, random.getrandbits(48), None)
+        return self.l2.get(key)
+
+    def get_versions(self) -> dict:
+        if (
+            self._versions is None
+            or time.monotonic() - self._versions_read > self._versions_timeout
+        ):
+            namespaces = {namespace for _, namespace in self._prefixes}
+            keys = {
+                self.get_version_key(namespace): namespace
+                for namespace in namespaces
+            }
+            versions = {
+                keys[key]: version
+                for key, version in self.l2.get_many(keys).items()
+            }
+            for namespace in namespaces - versions.keys():
+                versions[namespace] = self._new_counter(namespace)
+            self._versions = versions
+            self._versions_read = time.monotonic()
+        return self._versions
+
+    def bump(self, *namespaces):
+        """Retire the L1 copies of the namespaces in every worker."""
+        versions = self.get_versions()
+        for namespace in set(namespaces) - {None}:
+            try:
+                versions[namespace] = self.l2.incr(
+                    self.get_version_key(namespace))
+            except ValueError:
+                versions[namespace] = self._new_counter(namespace)
+
+    def _l1_key(self, key, version):
+        return self.l2.make_key(key, version=version)
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        missing = []
+        versions = self.get_versions() if self._prefixes else {}
+        for key in keys:
+            namespace = self.get_namespace(key)
+            if namespace is not None:
+                entry = self._l1.get(self._l1_key(key, version))
+                if entry is not None and entry[0] == versions[namespace]:
+                    found[key] = entry[1]
+                    continue
+            missing.append(key)
+        if missing:
+            loaded = self.l2.get_many(missing, version=version)
+            self._keep(loaded, version)
+            found.update(loaded)
+        return found
+
+    def _keep(self, data, version):
+        """Keep the values in L1 under the current namespace versions."""
+        if not self._prefixes:
+            return
+        versions = self.get_versions()
+        for key, value in data.items():
+            namespace = self.get_namespace(key)
+            if namespace is not None:
+                self._l1.set(
+                    self._l1_key(key, version), (versions[namespace], value)
+                )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version)
+        if timeout is None or timeout == DEFAULT_TIMEOUT or timeout > 0:
+            self._keep({
+                key: value for key, value in data.items()
+                if key not in failed
+            }, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added:
+            self._keep({key: value}, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version)
+        self.bump(self.get_namespace(key))
+        return value
+
+    def has_key(self, key, version=None):
+        return self.l2.has_key(key, version)  # noqa: W601
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version)
+        self.bump(self.get_namespace(key))
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.l2.delete_many(keys, version)
+        self.bump(*map(self.get_namespace, keys))
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
+        self._versions = None
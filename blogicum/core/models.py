@@ -1,7 +1,10 @@
 """Module with abstract models."""
+from django.core.cache import cache
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.safestring import mark_safe
 
-from blog.constants import TITLE_TEXT_SLICE
+from blog.constants import TEXT_HTML_VERSION, TITLE_TEXT_SLICE
 
 
 class PublishedTimeModel(models.Model):
@@ -35,3 +38,84 @@ class TitleModel(models.Model):
 
     def __str__(self) -> str:
         return self.title[:TITLE_TEXT_SLICE]
+
+
+class LoadedStateModel(models.Model):
+    """Abstract model. Remembers field values loaded or last saved."""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def get_loaded_value(self, attname, default=None):
+        """Value of the field as it was when the row was loaded."""
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+
+class RenderedTextModel(models.Model):
+    """Abstract model. Keeps ``text`` rendered to HTML in the cache.
+
+    The HTML is rendered when the row is saved. ``TEXT_HTML_VERSION`` is
+    the cache version, so changing the rendering retires old entries.
+    """
+
+    class Meta:
+        abstract = True
+
+    def get_text_html_key(self) -> str:
+        return f'text-html:{self._meta.label_lower}:{self.pk}'
+
+    def render_text_html(self) -> str:
+        return linebreaksbr(self.text)
+
+    def cache_text_html(self) -> str:
+        self._text_html = self.render_text_html()
+        cache.set(
+            self.get_text_html_key(),
+            self._text_html,
+            None,
+            version=TEXT_HTML_VERSION
+        )
+        return self._text_html
+
+    def get_text_html(self) -> str:
+        html = getattr(self, '_text_html', None)
+        if html is None:
+            html = cache.get(
+                self.get_text_html_key(), version=TEXT_HTML_VERSION
+            )
+        if html is None:
+            html = self.cache_text_html()
+        return mark_safe(html)
+
+    @classmethod
+    def prefetch_text_html(cls, objects):
+        """Read cached HTML of many objects with one cache request."""
+        keys = {obj.get_text_html_key(): obj for obj in objects}
+        for key, html in cache.get_many(
+                keys, version=TEXT_HTML_VERSION).items():
+            keys[key]._text_html = html
+        return objects
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.cache_text_html()
+
+    def delete(self, *args, **kwargs):
+        key = self.get_text_html_key()
+        deleted = super().delete(*args, **kwargs)
+        cache.delete(key, version=TEXT_HTML_VERSION)
+        return deleted
@@ -0,0 +1,198 @@
+"""Opt-in cache of queryset results, invalidated per table.
+
+``Model.objects.filter(...).cache()`` stores the results under the
+compiled SQL, its params and the versions of the tables the query
+reads. Every INSERT, UPDATE or DELETE that reaches the database,
+including bulk ``update()`` and ``delete()``, drops the version of its
+table, so the dependent entries are never read again. Only the tables
+cached queries may read are tracked (``get_cached_tables()``): writes
+to the others, e.g. sessions, cost no cache calls, and queries reading
+them are not cached. A failing cache is logged and does not fail the
+write.
+
+Inside a transaction that has written a table, queries reading it skip
+the cache: they would see rows other workers cannot see yet.
+"""
+import logging
+import re
+from functools import lru_cache
+from hashlib import md5
+from uuid import uuid4
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models import QuerySet
+
+from blog.constants import QUERY_CACHE_TIMEOUT
+
+WRITE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)'
+    r'\s+[`"\[]?(\w+)',
+    re.IGNORECASE
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_table_key(table: str) -> str:
+    return f'querycache:table:{table}'
+
+
+@lru_cache(maxsize=None)
+def get_known_tables() -> frozenset:
+    return frozenset(
+        model._meta.db_table
+        for model in apps.get_models(include_auto_created=True)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_cached_tables() -> frozenset:
+    """Tables of the models with a ``CachedQuerySet`` and those they join.
+
+    Joins follow the foreign keys, as ``select_related()`` does.
+    """
+    models = [
+        model for model in apps.get_models()
+        if isinstance(model._default_manager.all(), CachedQuerySet)
+    ]
+    tables = set()
+    while models:
+        model = models.pop()
+        if model._meta.db_table in tables:
+            continue
+        tables.add(model._meta.db_table)
+        for field in model._meta.concrete_fields:
+            if field.many_to_one or field.one_to_one:
+                models.append(field.related_model)
+    return frozenset(tables)
+
+
+def get_read_tables(sql: str, connection) -> list:
+    """Model tables named in the SQL, subqueries included."""
+    return sorted(
+        table for table in get_known_tables()
+        if connection.ops.quote_name(table) in sql
+    )
+
+
+def get_table_versions(tables) -> dict:
+    keys = {get_table_key(table): table for table in tables}
+    versions = {
+        keys[key]: version for key, version in cache.get_many(keys).items()
+    }
+    for table in keys.values():
+        if table not in versions:
+            version = uuid4().hex
+            if not cache.add(get_table_key(table), version, None):
+                version = cache.get(get_table_key(table), version)
+            versions[table] = version
+    return versions
+
+
+def invalidate_tables(*tables):
+    try:
+        cache.delete_many([get_table_key(table) for table in tables])
+    except Exception:
+        # The write has been done; the entries expire by their timeout.
+        logger.exception('Invalidating %s failed', ', '.join(tables))
+
+
+def get_written_tables(connection) -> set:
+    if not connection.in_atomic_block:
+        connection.querycache_written = set()
+    return connection.__dict__.setdefault('querycache_written', set())
+
+
+def invalidate_on_write(execute, sql, params, many, context):
+    """Execute wrapper dropping the versions of the written tables."""
+    result = execute(sql, params, many, context)
+    match = WRITE_RE.match(sql)
+    if match is not None and match.group(1) in get_cached_tables():
+        table = match.group(1)
+        connection = context['connection']
+        invalidate_tables(table)
+        if connection.in_atomic_block:
+            get_written_tables(connection).add(table)
+            transaction.on_commit(
+                lambda: invalidate_tables(table), using=connection.alias
+            )
+    return result
+
+
+def install(connection, **kwargs):
+    """``connection_created`` receiver."""
+    if invalidate_on_write not in connection.execute_wrappers:
+        connection.execute_wrappers.append(invalidate_on_write)
+
+
+class CachedQuerySet(QuerySet):
+    """QuerySet whose results may be cached with ``cache()``.
+
+    As in the cache API, ``cache(None)`` keeps the results until a write.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_results = False
+        self._cache_timeout = QUERY_CACHE_TIMEOUT
+
+    def cache(self, timeout=QUERY_CACHE_TIMEOUT):
+        clone = self._chain()
+        clone._cache_results = True
+        clone._cache_timeout = timeout
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cache_results = self._cache_results
+        clone._cache_timeout = self._cache_timeout
+        return clone
+
+    def _get_cache_key(self):
+        """Key of the results, None if they must not be cached."""
+        if self._known_related_objects:
+            # Related managers set their instance on every row.
+            return None
+        connection = connections[self.db]
+        try:
+            sql, params = self.query.get_compiler(self.db).as_sql()
+        except EmptyResultSet:
+            return None
+        tables = get_read_tables(sql, connection)
+        if (
+            not tables
+            or not get_cached_tables().issuperset(tables)
+            or get_written_tables(connection).intersection(tables)
+        ):
+            return None
+        versions = get_table_versions(tables)
+        return 'querycache:{}'.format(md5(repr((
+            self.db,
+            self._iterable_class.__name__,
+            sql,
+            params,
+            sorted(versions.items()),
+        )).encode()).hexdigest())
+
+    def _fetch_cached(self):
+        key = self._get_cache_key()
+        if key is None:
+            return list(self._iterable_class(self))
+        results = cache.get(key)
+        if results is None:
+            results = list(self._iterable_class(self))
+            cache.set(key, results, self._cache_timeout)
+        return results
+
+    def _fetch_all(self):
+        if self._cache_results and self._result_cache is None:
+            self._result_cache = self._fetch_cached()
+        super()._fetch_all()
+
+    def iterator(self, chunk_size=2000):
+        if not self._cache_results:
+            return super().iterator(chunk_size)
+        return iter(self._fetch_cached())
@@ -0,0 +1,20 @@
+// Fills the slots of a shared page with the parts rendered for the reader.
+document.addEventListener('DOMContentLoaded', () => {
+  const url = document.body.dataset.fragments;
+  if (!url) {
+    return;
+  }
+  fetch(url, {credentials: 'same-origin'})
+    .then((response) => response.text())
+    .then((html) => {
+      const fragments = new DOMParser().parseFromString(html, 'text/html');
+      fragments.querySelectorAll('template[data-slot]').forEach((fragment) => {
+        const slot = document.querySelector(
+          `div[data-slot="${fragment.dataset.slot}"]`
+        );
+        if (slot) {
+          slot.replaceWith(fragment.content.cloneNode(true));
+        }
+      });
+    });
+});
@@ -18,7 +18,9 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +43,34 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture
+def no_page_cache(monkeypatch):
+    from blog.mixins import PageCacheMixin
+    monkeypatch.setattr(PageCacheMixin, 'page_cache', False)
+
+
+@pytest.fixture(autouse=True, scope='session')
+def test_caches(tmp_path_factory):
+    """Shared cache in a file of the test session, not the project's."""
+    test_settings = {
+        alias: dict(config) for alias, config in settings.CACHES.items()
+    }
+    test_settings['shared']['LOCATION'] = (
+        tmp_path_factory.mktemp('cache') / 'cache.sqlite3'
+    )
+    with override_settings(CACHES=test_settings):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(test_caches):
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
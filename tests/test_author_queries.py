@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        Comment, post=post_with_published_location, author=user)
+
+
+# Session and user are two queries, the target row is the third one.
+@pytest.mark.parametrize(
+    'url',
+    [
+        '/posts/{post.id}/delete/',
+        '/posts/{post.id}/delete_comment/{comment.id}/',
+        '/posts/{post.id}/edit_comment/{comment.id}/',
+    ],
+    ids=['delete post', 'delete comment', 'edit comment']
+)
+def test_target_loaded_once(
+        user_client, django_assert_num_queries, own_comment, url):
+    url = url.format(post=own_comment.post, comment=own_comment)
+    with django_assert_num_queries(3):
+        response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что страницы редактирования и удаления загружают'
+        ' публикацию или комментарий один раз за запрос.'
+    )
+
+
+def test_not_author_redirected(another_user_client, own_comment):
+    post = own_comment.post
+    response = another_user_client.get(f'/posts/{post.id}/edit/')
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == f'/posts/{post.id}/'
+    response = another_user_client.get(
+        f'/posts/{post.id}/edit_comment/{own_comment.id}/')
+    assert response.url == f'/posts/{post.id}/'
+
+
+def test_comment_of_another_post_404(
+        user_client, own_comment, post_of_another_author):
+    response = user_client.get(
+        f'/posts/{post_of_another_author.id}/edit_comment/{own_comment.id}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что комментарий нельзя открыть по адресу чужой'
+        ' публикации.'
+    )
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.utils import get_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stored_count(post) -> int:
+    return Post.objects.values_list(
+        'comment_count', flat=True).get(pk=post.pk)
+
+
+def test_comment_count_follows_comments(
+        mixer, user, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post, author=user)
+    assert _stored_count(post) == 3, (
+        'Убедитесь, что при создании комментария увеличивается'
+        ' `Post.comment_count`.'
+    )
+
+    comments[0].is_published = False
+    comments[0].save()
+    assert _stored_count(post) == 2, (
+        'Убедитесь, что в `Post.comment_count` учитываются только'
+        ' опубликованные комментарии.'
+    )
+
+    comments[1].delete()
+    assert _stored_count(post) == 1, (
+        'Убедитесь, что при удалении комментария уменьшается'
+        ' `Post.comment_count`.'
+    )
+
+
+def test_comment_count_on_comment_move(
+        mixer, user, post_with_published_location, post_of_another_author):
+    comment = mixer.blend(
+        Comment, post=post_with_published_location, author=user)
+    comment = Comment.objects.get(pk=comment.pk)
+    comment.post = post_of_another_author
+    comment.save()
+    assert _stored_count(post_with_published_location) == 0
+    assert _stored_count(post_of_another_author) == 1
+
+
+def test_comment_count_on_author_cascade(
+        mixer, another_user, post_with_published_location):
+    mixer.cycle(2).blend(
+        Comment, post=post_with_published_location, author=another_user)
+    another_user.delete()
+    assert _stored_count(post_with_published_location) == 0, (
+        'Убедитесь, что `Post.comment_count` обновляется при каскадном'
+        ' удалении комментариев.'
+    )
+
+
+def test_feed_has_no_aggregate(post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        list(get_posts())
+    sql = queries.captured_queries[-1]['sql'].upper()
+    assert 'COUNT(' not in sql and 'GROUP BY' not in sql, (
+        'Убедитесь, что лента публикаций читает сохранённое'
+        ' `comment_count` без агрегации комментариев.'
+    )
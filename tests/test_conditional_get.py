@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.parametrize(
+    'url',
+    ['/', '/category/{category.slug}/', '/profile/{author.username}/',
+     '/posts/{post.id}/'],
+    ids=['index', 'category', 'profile', 'detail']
+)
+def test_not_modified(client, django_assert_num_queries,
+                      post_with_published_location, url):
+    post = post_with_published_location
+    url = url.format(category=post.category, author=post.author, post=post)
+    response = client.get(url)
+    assert response.has_header('ETag') and response.has_header(
+        'Last-Modified')
+    with django_assert_num_queries(0):
+        not_modified = _revalidate(client, url, response)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что на условный запрос неизменившейся страницы'
+        ' отвечается 304 без запросов к базе данных.'
+    )
+    assert not not_modified.content
+
+
+def test_if_modified_since(client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = client.get(url)
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_modified_after_change(client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    response = client.get(url)
+    post.title = 'Новый заголовок'
+    post.save()
+    modified = _revalidate(client, url, response)
+    assert modified.status_code == HTTPStatus.OK, (
+        'Убедитесь, что после изменения публикации условный запрос'
+        ' получает новую страницу.'
+    )
+    assert modified['ETag'] != response['ETag']
+
+
+def test_personal_page_not_modified(
+        user_client, django_assert_num_queries, user,
+        post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    user_client.get(url)
+    response = user_client.get(url)
+    with django_assert_num_queries(2):
+        # Session and user only.
+        not_modified = _revalidate(user_client, url, response)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что условный запрос страницы читателя получает 304,'
+        ' пока она не изменилась.'
+    )
+    Comment.objects.create(post=post, author=user, text='Новый комментарий')
+    modified = _revalidate(user_client, url, response)
+    assert modified.status_code == HTTPStatus.OK
+    assert 'Новый комментарий' in modified.content.decode('utf-8'), (
+        'Убедитесь, что новый комментарий сбрасывает валидаторы страницы.'
+    )
+
+
+def test_personal_validators_not_shared(
+        user_client, another_user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    user_client.get(url)
+    response = user_client.get(url)
+    assert _revalidate(
+        another_user_client, url, response
+    ).status_code == HTTPStatus.OK
+
+
+def test_updated_at(post_with_published_location, user):
+    post = post_with_published_location
+    updated_at = post.updated_at
+    Comment.objects.create(post=post, author=user, text='Комментарий')
+    post.refresh_from_db()
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что комментарий обновляет время изменения публикации.'
+    )
+
+
+def test_personal_page_modified_after_rename(
+        user_client, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    post.author = another_user
+    post.save()
+    url = f'/posts/{post.id}/'
+    user_client.get(url)
+    response = user_client.get(url)
+    user.username = 'renamed'
+    user.save()
+    modified = _revalidate(user_client, url, response)
+    assert modified.status_code == HTTPStatus.OK, (
+        'Убедитесь, что изменение читателя сбрасывает валидаторы его'
+        ' страниц.'
+    )
+    assert 'renamed' in modified.content.decode('utf-8')
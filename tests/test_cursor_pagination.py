@@ -0,0 +1,101 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog.mixins import ListPostMixin
+from blog.paginators import encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cursor_pagination(monkeypatch):
+    monkeypatch.setattr(ListPostMixin, 'cursor_pagination', True)
+
+
+@pytest.fixture
+def dated_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    # Two posts share a pub_date, so the id has to break the tie.
+    dates = [now - timedelta(hours=i // 2) for i in range(1, N_PER_PAGE * 2 + 6)]
+    return mixer.cycle(len(dates)).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(date for date in dates),
+    )
+
+
+def _page_ids(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK
+    return [post.id for post in response.context['page_obj']], response
+
+
+@pytest.mark.usefixtures('cursor_pagination')
+def test_cursor_walks_feed(client, dated_posts):
+    expected = [
+        post.id for post in sorted(
+            dated_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    walked = []
+    params = {}
+    while params is not None:
+        ids, response = _page_ids(client, '/', **params)
+        walked.extend(ids)
+        page = response.context['page_obj']
+        params = {'after': page.next_cursor} if page.has_next() else None
+    assert walked == expected, (
+        'Убедитесь, что при курсорной пагинации лента проходится целиком,'
+        ' без пропусков и повторов.'
+    )
+
+    last_page = response.context['page_obj']
+    start = expected.index(last_page[0].id)
+    ids, _ = _page_ids(client, '/', before=last_page.previous_cursor)
+    assert ids == expected[start - N_PER_PAGE:start], (
+        'Убедитесь, что ссылка на предыдущую страницу курсорной пагинации'
+        ' возвращает соседнюю более новую страницу.'
+    )
+
+
+@pytest.mark.usefixtures('cursor_pagination')
+def test_cursor_is_stable_on_new_posts(
+        client, mixer, user, published_category, dated_posts):
+    _, response = _page_ids(client, '/')
+    cursor = response.context['page_obj'].next_cursor
+    second_ids, _ = _page_ids(client, '/', after=cursor)
+
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now()
+    )
+    assert _page_ids(client, '/', after=cursor)[0] == second_ids, (
+        'Убедитесь, что ссылки курсорной пагинации не сдвигаются после'
+        ' публикации новых постов.'
+    )
+
+
+@pytest.mark.usefixtures('cursor_pagination')
+def test_cursor_links_rendered(client, dated_posts):
+    _, response = _page_ids(client, '/')
+    content = response.content.decode('utf-8')
+    assert '?after=' in content
+    assert '?page=' not in content
+
+
+@pytest.mark.usefixtures('cursor_pagination')
+def test_invalid_cursor_404(client, dated_posts):
+    response = client.get('/?after=yesterday')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_encode_cursor(post_with_published_location):
+    post = post_with_published_location
+    assert encode_cursor(post) == f'{post.pub_date.isoformat()},{post.id}'
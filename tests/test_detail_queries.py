@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, user, another_user, post_with_published_location):
+    mixer.cycle(3).blend(
+        Comment, post=post_with_published_location, author=another_user)
+    return post_with_published_location
+
+
+# Logged in clients also load the session and the user.
+@pytest.mark.parametrize(
+    ('client_name', 'expected_queries'),
+    [
+        ('unlogged_client', 2),
+        ('another_user_client', 4),
+        ('user_client', 4),
+    ],
+    ids=['anonymous', 'other user', 'author']
+)
+def test_detail_queries(
+        request, django_assert_num_queries, commented_post,
+        client_name, expected_queries):
+    client = request.getfixturevalue(client_name)
+    with django_assert_num_queries(expected_queries):
+        response = client.get(f'/posts/{commented_post.pk}/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что страница публикации загружается одним запросом к'
+        ' публикации вместе с категорией, местоположением и автором.'
+    )
+
+
+def test_detail_hidden_post(
+        user_client, another_user_client, unlogged_client, commented_post):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f'/posts/{commented_post.pk}/'
+    assert user_client.get(url).status_code == HTTPStatus.OK
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert unlogged_client.get(url).status_code == HTTPStatus.NOT_FOUND
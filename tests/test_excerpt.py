@@ -0,0 +1,26 @@
+import pytest
+from django.template.defaultfilters import truncatewords
+
+from blog.utils import get_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_excerpt_stored_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = ' '.join(f'слово{i}' for i in range(50))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(post.text, 10), (
+        'Убедитесь, что при сохранении публикации в `excerpt` записываются'
+        ' первые десять слов текста.'
+    )
+
+
+def test_feed_defers_text(client, post_with_published_location):
+    sql = str(get_posts().query)
+    assert '"blog_post"."text"' not in sql, (
+        'Убедитесь, что лента не загружает полный текст публикаций.'
+    )
+    content = client.get('/').content.decode('utf-8')
+    assert post_with_published_location.excerpt in content
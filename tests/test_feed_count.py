@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import feeds, paginators
+from blog.paginators import get_feed_count_key, invalidate_feed_counts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def past_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(25).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def _count_queries(client, url) -> int:
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return sum(
+        'COUNT(' in query['sql'].upper() for query in queries.captured_queries
+    )
+
+
+def test_count_cached_per_feed(
+        client, monkeypatch, user, published_category, past_posts):
+    # Feeds longer than the cached id list are counted by the database.
+    monkeypatch.setattr(feeds, 'FEED_CACHED_IDS', 5)
+    urls = (
+        '/?page=2',
+        f'/category/{published_category.slug}/?page=2',
+        f'/profile/{user.username}/?page=2',
+    )
+    for url in urls:
+        assert _count_queries(client, url) == 1
+        assert _count_queries(client, url) == 0, (
+            'Убедитесь, что число публикаций в ленте берётся из кеша при'
+            ' повторном открытии страницы.'
+        )
+
+
+def test_count_invalidated_on_unpublish(client, past_posts):
+    response = client.get('/')
+    assert response.context['paginator'].count == len(past_posts)
+
+    past_posts[0].is_published = False
+    past_posts[0].save()
+    response = client.get('/')
+    assert response.context['paginator'].count == len(past_posts) - 1, (
+        'Убедитесь, что кешированное число публикаций сбрасывается при'
+        ' снятии публикации.'
+    )
+
+    past_posts[1].delete()
+    response = client.get('/')
+    assert response.context['paginator'].count == len(past_posts) - 2, (
+        'Убедитесь, что кешированное число публикаций сбрасывается при'
+        ' удалении публикации.'
+    )
+
+
+def test_count_invalidated_on_category_unpublish(
+        client, published_category, past_posts):
+    client.get('/')
+    published_category.is_published = False
+    published_category.save()
+    assert client.get('/').context['paginator'].count == 0
+
+
+def test_approximate_count_kept(monkeypatch):
+    monkeypatch.setattr(paginators, 'FEED_COUNT_APPROXIMATE_THRESHOLD', 100)
+    cache.set(get_feed_count_key('index'), 150)
+    cache.set(get_feed_count_key('category:news'), 50)
+    invalidate_feed_counts('index', 'category:news')
+    assert cache.get(get_feed_count_key('index')) == 150
+    assert cache.get(get_feed_count_key('category:news')) is None
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog import feeds
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('no_page_cache')]
+
+
+@pytest.fixture
+def past_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(15).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def _page_titles(client, url='/', **params):
+    response = client.get(url, params)
+    return [post.title for post in response.context['page_obj']]
+
+
+def test_hot_page_without_queries(
+        client, django_assert_num_queries, past_posts):
+    first = _page_titles(client, page=2)
+    with django_assert_num_queries(0):
+        assert _page_titles(client, page=2) == first, (
+            'Убедитесь, что повторная загрузка страницы ленты берёт'
+            ' публикации из кеша без запросов к базе данных.'
+        )
+
+
+def test_page_misses_hydrated_in_one_query(
+        client, django_assert_num_queries, past_posts):
+    client.get('/')
+    feeds.invalidate_posts(*(post.id for post in past_posts))
+    with django_assert_num_queries(1):
+        client.get('/')
+
+
+def test_feed_invalidated_on_changes(
+        client, mixer, user, published_category, published_location,
+        past_posts):
+    client.get('/')
+
+    post = sorted(past_posts, key=lambda post: (post.pub_date, post.id))[-1]
+    mixer.blend(Comment, post=post, author=user)
+    response = client.get('/')
+    assert response.context['page_obj'][0].comment_count == 1, (
+        'Убедитесь, что кеш публикации сбрасывается при добавлении'
+        ' комментария.'
+    )
+
+    published_category.title = 'Новое название'
+    published_category.save()
+    response = client.get('/')
+    assert response.context['page_obj'][0].category.title == (
+        'Новое название')
+
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, pub_date=timezone.now()
+    )
+    assert _page_titles(client)[0] == new_post.title, (
+        'Убедитесь, что новая публикация сразу появляется в кешированной'
+        ' ленте.'
+    )
+
+    new_post.delete()
+    assert new_post.title not in _page_titles(client)
+
+
+def test_deep_pages_fall_back_to_queryset(client, monkeypatch, past_posts):
+    monkeypatch.setattr(feeds, 'FEED_CACHED_IDS', 5)
+    ordered = sorted(
+        past_posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    assert _page_titles(client, page=2) == [
+        post.title for post in ordered[10:]]
+
+
+def test_feed_invalidated_again_on_commit(
+        client, django_capture_on_commit_callbacks, past_posts):
+    client.get('/')
+    post = past_posts[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        post.is_published = False
+        post.save()
+        # A reader refills the cache before the writer commits; the
+        # test transaction shows it the new row, a real one the old.
+        client.get('/')
+        feeds.cache.set(feeds.get_feed_ids_key('index'), [post.id])
+        feeds.cache.set(feeds.get_post_key(post.id), post)
+    assert feeds.cache.get(feeds.get_feed_ids_key('index')) is None, (
+        'Убедитесь, что кеш ленты сбрасывается ещё раз после фиксации'
+        ' транзакции.'
+    )
+    assert feeds.cache.get(feeds.get_post_key(post.id)) is None
+    assert post.title not in _page_titles(client)
+
+
+def test_cached_posts_without_private_author_fields(client, past_posts):
+    shown = client.get('/').context['page_obj'][0]
+    post = feeds.cache.get(feeds.get_post_key(shown.id))
+    assert post.author.username == shown.author.username
+    assert not {'password', 'email'} & vars(post.author).keys(), (
+        'Убедитесь, что в кеш публикаций не попадают пароль и почта автора.'
+    )
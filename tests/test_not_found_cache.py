@@ -0,0 +1,98 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    'url',
+    ['/posts/999/', '/profile/nobody/', '/category/nothing/'],
+    ids=['post', 'profile', 'category']
+)
+def test_not_found_cached(client, django_assert_num_queries, url):
+    first = client.get(url)
+    assert first.status_code == HTTPStatus.NOT_FOUND
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.status_code == HTTPStatus.NOT_FOUND
+    assert second.content == first.content, (
+        'Убедитесь, что страница 404 для несуществующего объекта отдаётся'
+        ' из кеша без запросов к базе данных.'
+    )
+
+
+def test_not_found_lookup_cached(django_assert_num_queries, user_client):
+    user_client.get('/profile/nobody/')
+    with django_assert_num_queries(2):
+        # Session and user only: the missing username is remembered.
+        response = user_client.get('/profile/nobody/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_created_post_found(client, mixer, user, published_category):
+    assert client.get('/posts/999/').status_code == HTTPStatus.NOT_FOUND
+    mixer.blend(
+        'blog.Post', id=999, author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(hours=1)
+    )
+    assert client.get('/posts/999/').status_code == HTTPStatus.OK, (
+        'Убедитесь, что закешированный ответ 404 сбрасывается при создании'
+        ' публикации.'
+    )
+
+
+def test_published_post_found(client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/'
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    post.is_published = True
+    post.save()
+    assert client.get(url).status_code == HTTPStatus.OK, (
+        'Убедитесь, что закешированный ответ 404 сбрасывается при'
+        ' публикации поста.'
+    )
+
+
+def test_author_sees_unpublished_post(
+        client, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/'
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(url).status_code == HTTPStatus.OK
+
+
+def test_created_user_found(client, mixer):
+    assert client.get('/profile/newcomer/').status_code == (
+        HTTPStatus.NOT_FOUND)
+    mixer.blend('auth.User', username='newcomer')
+    assert client.get('/profile/newcomer/').status_code == HTTPStatus.OK, (
+        'Убедитесь, что закешированный ответ 404 сбрасывается при'
+        ' регистрации пользователя.'
+    )
+
+
+def test_created_category_found(client, mixer):
+    assert client.get('/category/fresh/').status_code == HTTPStatus.NOT_FOUND
+    mixer.blend('blog.Category', slug='fresh', is_published=True)
+    assert client.get('/category/fresh/').status_code == HTTPStatus.OK
+
+
+def test_republished_category_posts_found(
+        client, published_category, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    published_category.is_published = True
+    published_category.save()
+    assert client.get(url).status_code == HTTPStatus.OK, (
+        'Убедитесь, что закешированный ответ 404 сбрасывается, когда'
+        ' публикация снова видна после публикации категории.'
+    )
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.pagecache import purge_tags
+from blog.views import PostDetailView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def detail_url(post_with_published_location):
+    return f'/posts/{post_with_published_location.id}/'
+
+
+@pytest.mark.parametrize(
+    'url',
+    [
+        '/',
+        '/category/{post.category.slug}/',
+        '/profile/{post.author.username}/',
+        '/posts/{post.id}/',
+    ],
+    ids=['index', 'category', 'profile', 'detail']
+)
+def test_anonymous_page_cached(
+        client, django_assert_num_queries, post_with_published_location,
+        url):
+    url = url.format(post=post_with_published_location)
+    first = client.get(url)
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content, (
+        'Убедитесь, что страница для анонимного пользователя отдаётся из'
+        ' кеша без запросов к базе данных.'
+    )
+
+
+def test_logged_in_page_not_cached(user_client, detail_url):
+    user_client.get(detail_url)
+    response = user_client.get(detail_url)
+    assert response.context is not None, (
+        'Убедитесь, что страницы авторизованных пользователей не кешируются.'
+    )
+
+
+def test_page_purged_on_comment(
+        client, mixer, user, post_with_published_location, detail_url):
+    client.get(detail_url)
+    comment = mixer.blend(
+        Comment, post=post_with_published_location, author=user,
+        text='Свежий комментарий'
+    )
+    assert comment.text in client.get(detail_url).content.decode('utf-8'), (
+        'Убедитесь, что кеш страницы публикации сбрасывается при'
+        ' добавлении комментария.'
+    )
+
+
+def test_page_purged_on_category_change(
+        client, published_category, detail_url):
+    client.get(detail_url)
+    published_category.title = 'Переименованная'
+    published_category.save()
+    assert 'Переименованная' in client.get(detail_url).content.decode(
+        'utf-8'), (
+        'Убедитесь, что кеш страниц сбрасывается при изменении категории.'
+    )
+
+
+def test_feed_purged_on_new_post(
+        client, mixer, user, published_category, post_with_published_location):
+    client.get('/')
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Новая публикация', pub_date=timezone.now() - timedelta(hours=1)
+    )
+    assert post.title in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что кеш ленты сбрасывается при публикации поста.'
+    )
+
+
+def test_unrelated_change_keeps_page(
+        client, django_assert_num_queries, post_with_published_location,
+        post_of_another_author, detail_url):
+    client.get(detail_url)
+    post_of_another_author.title = 'Другая публикация'
+    post_of_another_author.save()
+    with django_assert_num_queries(0):
+        client.get(detail_url)
+
+
+def test_purge_during_render_expires_page(
+        client, monkeypatch, post_with_published_location, detail_url):
+    get_object = PostDetailView.get_object
+
+    def get_object_then_purge(view, queryset=None):
+        post = get_object(view, queryset)
+        # A writer purges the post after the view has read it.
+        purge_tags(f'post:{post.pk}')
+        return post
+
+    monkeypatch.setattr(PostDetailView, 'get_object', get_object_then_purge)
+    client.get(detail_url)
+    monkeypatch.undo()
+    assert client.get(detail_url).context is not None, (
+        'Убедитесь, что страница кешируется с версиями тегов, прочитанными'
+        ' до чтения данных.'
+    )
+
+
+def test_page_purged_again_on_commit(
+        client, django_capture_on_commit_callbacks,
+        post_with_published_location, detail_url):
+    client.get(detail_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        purge_tags(f'post:{post_with_published_location.pk}')
+        # A reader caches the page again before the writer commits.
+        client.get(detail_url)
+    assert client.get(detail_url).context is not None, (
+        'Убедитесь, что теги страниц сбрасываются ещё раз после фиксации'
+        ' транзакции.'
+    )
@@ -0,0 +1,20 @@
+import pytest
+from django.core.cache import cache
+
+from blog.paginators import get_feed_count_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('num_pages', [20, 5_000])
+def test_page_links_bounded(client, post_with_published_location, num_pages):
+    cache.set(get_feed_count_key('index'), num_pages * 10)
+    content = client.get(
+        '/', {'page': num_pages // 2}).content.decode('utf-8')
+    links = content.count('class="page-item')
+    assert links <= 13, (
+        'Убедитесь, что пагинатор выводит ограниченное число ссылок на'
+        ' страницы, а не ссылку на каждую страницу ленты.'
+    )
+    assert f'?page={num_pages}"' in content
+    assert '…' in content
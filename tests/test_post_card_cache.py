@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from blog import feeds
+from blog.models import Comment
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('no_page_cache')
+]
+
+
+def _card_key(response, post_id):
+    post = next(
+        post for post in response.context['page_obj'] if post.id == post_id
+    )
+    return make_template_fragment_key(
+        'post_card', [post.pk, post.card_version]
+    )
+
+
+def test_card_cached_across_feeds(client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get('/')
+    key = _card_key(response, post.id)
+    assert cache.get(key), (
+        'Убедитесь, что карточка публикации кешируется как фрагмент шаблона.'
+    )
+    response = client.get(f'/category/{post.category.slug}/')
+    assert _card_key(response, post.id) == key, (
+        'Убедитесь, что карточка публикации на странице категории берётся'
+        ' из того же фрагмента, что и на главной.'
+    )
+
+
+def test_card_version_bumped_on_comment(
+        client, mixer, user, post_with_published_location):
+    post = post_with_published_location
+    key = _card_key(client.get('/'), post.id)
+    mixer.blend(Comment, post=post, author=user)
+    response = client.get('/')
+    assert _card_key(response, post.id) != key
+    assert 'Комментарии (1)' in response.content.decode('utf-8'), (
+        'Убедитесь, что карточка публикации обновляется при добавлении'
+        ' комментария.'
+    )
+
+
+def test_card_version_bumped_on_category_change(
+        client, published_category, post_with_published_location):
+    client.get('/')
+    published_category.title = 'Переименованная'
+    published_category.save()
+    assert 'Переименованная' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что карточка публикации обновляется при изменении'
+        ' категории.'
+    )
+
+
+def test_card_version_read_before_posts(
+        client, mixer, monkeypatch, user, post_with_published_location):
+    get_posts_by_ids = feeds.get_posts_by_ids
+
+    def get_posts_then_comment(post_ids):
+        posts = get_posts_by_ids(post_ids)
+        # A comment lands after the posts have been read.
+        mixer.blend(Comment, post=post_with_published_location, author=user)
+        return posts
+
+    monkeypatch.setattr(feeds, 'get_posts_by_ids', get_posts_then_comment)
+    client.get('/')
+    monkeypatch.undo()
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что версия карточки читается до загрузки публикаций.'
+    )
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from blog.views import ProfileView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_profile_feed_filters_author_id(user, post_with_published_location):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    view = ProfileView()
+    view.setup(request, username=user.username)
+    where = str(view.get_queryset().query).split(' WHERE ')[1]
+    assert f'"blog_post"."author_id" = {user.pk}' in where, (
+        'Убедитесь, что лента профиля фильтруется по `author_id`, без'
+        ' соединения с таблицей пользователей.'
+    )
+    assert '"auth_user"."username"' not in where
+
+
+@pytest.mark.usefixtures('no_page_cache')
+def test_profile_user_resolved_once(
+        client, django_assert_num_queries, user,
+        post_with_published_location):
+    url = f'/profile/{user.username}/'
+    client.get(url)
+    # The feed is cached, the profile user is the only query left.
+    with django_assert_num_queries(1):
+        response = client.get(url)
+    assert response.context['profile'] == user
+
+
+def test_username_change_invalidates_cache(user_client, user):
+    old_username = user.username
+    assert user_client.get(
+        f'/profile/{old_username}/').status_code == HTTPStatus.OK
+    response = user_client.post('/profile/edit/', {
+        'username': 'renamed_user',
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'email': 'renamed@example.com',
+    })
+    assert response.status_code == HTTPStatus.FOUND
+    assert user_client.get(
+        f'/profile/{old_username}/').status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что после смены имени пользователя старый адрес профиля'
+        ' больше не открывается.'
+    )
+    assert user_client.get(
+        '/profile/renamed_user/').status_code == HTTPStatus.OK
+
+
+def test_username_change_by_save_invalidates_cache(client, user):
+    old_username = user.username
+    assert client.get(
+        f'/profile/{old_username}/').status_code == HTTPStatus.OK
+    user.username = 'renamed_user'
+    user.save()
+    assert client.get(
+        f'/profile/{old_username}/').status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что старое имя пользователя забывается при любом'
+        ' сохранении, не только из формы профиля.'
+    )
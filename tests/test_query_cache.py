@@ -0,0 +1,132 @@
+import sqlite3
+
+import pytest
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import transaction
+
+from blog.forms import PostForm
+from core import querycache
+from blog.models import Category, Comment, Post
+
+# Rows written in a test transaction are never cached, so the tests
+# commit their writes.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def test_repeated_query_cached(django_assert_num_queries, published_category):
+    titles = list(Category.objects.values_list('title', flat=True).cache())
+    with django_assert_num_queries(0):
+        assert list(
+            Category.objects.values_list('title', flat=True).cache()
+        ) == titles, (
+            'Убедитесь, что повторный запрос до изменения таблицы берётся'
+            ' из кеша.'
+        )
+
+
+def test_not_cached_without_opt_in(
+        django_assert_num_queries, published_category):
+    list(Category.objects.all())
+    with django_assert_num_queries(1):
+        list(Category.objects.all())
+
+
+@pytest.mark.parametrize('write', [
+    lambda category: category.save(),
+    lambda category: Category.objects.update(title='Новое название'),
+    lambda category: Category.objects.filter(pk=category.pk).delete(),
+], ids=['save', 'update', 'delete'])
+def test_write_invalidates(
+        django_assert_num_queries, published_category, write):
+    list(Category.objects.cache())
+    write(published_category)
+    with django_assert_num_queries(1):
+        list(Category.objects.cache())
+
+
+def test_joined_table_invalidates(
+        django_assert_num_queries, post_with_published_location):
+    post = post_with_published_location
+    assert list(
+        Post.objects.filter(pk=post.pk).values_list(
+            'category__title', flat=True).cache()
+    ) == [post.category.title]
+    Category.objects.update(title='Новое название')
+    assert list(
+        Post.objects.filter(pk=post.pk).values_list(
+            'category__title', flat=True).cache()
+    ) == ['Новое название'], (
+        'Убедитесь, что запись в любую из прочитанных запросом таблиц'
+        ' сбрасывает его кеш.'
+    )
+
+
+def test_uncommitted_rows_not_cached(
+        django_assert_num_queries, post_with_published_location, user):
+    post = post_with_published_location
+    with transaction.atomic():
+        Comment.objects.create(post=post, author=user, text='Черновик')
+        assert Comment.objects.filter(post=post).cache().count() == 1
+        assert len(Comment.objects.filter(post=post).cache()) == 1
+        transaction.set_rollback(True)
+    assert len(Comment.objects.filter(post=post).cache()) == 0, (
+        'Убедитесь, что в кеш не попадают строки незавершённой транзакции.'
+    )
+
+
+def test_form_choices_cached(
+        django_assert_num_queries, published_category, published_location):
+    str(PostForm())
+    with django_assert_num_queries(0):
+        content = str(PostForm())
+    assert f'value="{published_category.pk}"' in content
+    assert f'value="{published_location.pk}"' in content
+
+
+def test_cache_without_timeout(
+        django_assert_num_queries, published_category):
+    list(Category.objects.cache(None))
+    with django_assert_num_queries(0):
+        list(Category.objects.cache(None))
+
+
+def test_comments_cached_without_private_author_fields(
+        client, user, post_with_published_location):
+    post = post_with_published_location
+    Comment.objects.create(post=post, author=user, text='Комментарий')
+    response = client.get(f'/posts/{post.id}/')
+    assert user.username in response.content.decode('utf-8')
+    [comment] = response.context['comments']
+    assert not {'password', 'email'} & vars(comment.author).keys(), (
+        'Убедитесь, что в кеш комментариев не попадают пароль и почта'
+        ' автора.'
+    )
+
+
+def test_untracked_table_write_skips_cache(monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(
+        querycache, 'invalidate_tables',
+        lambda *tables: invalidated.extend(tables))
+    SessionStore().save()
+    assert not invalidated, (
+        'Убедитесь, что запись в таблицы, которые кешируемые запросы не'
+        ' читают, не обращается к кешу.'
+    )
+
+
+def test_cache_failure_does_not_fail_write(
+        monkeypatch, caplog, published_category):
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(querycache.cache, 'delete_many', fail)
+    with transaction.atomic():
+        Category.objects.filter(pk=published_category.pk).update(
+            title='Новое название')
+    monkeypatch.undo()
+    published_category.refresh_from_db()
+    assert published_category.title == 'Новое название', (
+        'Убедитесь, что ошибка кеша не отменяет запись в базу данных.'
+    )
+    assert 'Invalidating blog_category failed' in caplog.text
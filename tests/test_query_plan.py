@@ -0,0 +1,72 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.views import CategoryPostsView, PostListView, ProfileView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _explain(queryset) -> str:
+    sql, params = queryset[:N_PER_PAGE].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+def _feed_queryset(view_cls, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_cls()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def _assert_uses_index(plan: str, page: str):
+    assert 'USE TEMP B-TREE' not in plan, (
+        f'Убедитесь, что запрос ленты {page} сортируется по индексу,'
+        f' а не во временном B-дереве:\n{plan}'
+    )
+    # An ordered walk over an index ("SCAN blog_post USING INDEX ...")
+    # stops at LIMIT; only a scan of the table itself reads every row.
+    assert not re.search(r'^SCAN (TABLE )?blog_post$', plan, re.M), (
+        f'Убедитесь, что запрос ленты {page} не читает таблицу'
+        f' публикаций целиком:\n{plan}'
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is SQLite only'
+)
+@pytest.mark.parametrize(
+    ('view_cls', 'kwargs', 'page'),
+    [
+        (PostListView, {}, 'главной страницы'),
+        (CategoryPostsView, {'category_slug': '{category.slug}'}, 'категории'),
+        (ProfileView, {'username': '{user.username}'}, 'профиля'),
+    ],
+    ids=['index', 'category', 'profile']
+)
+def test_feed_query_plan(
+        view_cls, kwargs, page, user, another_user, published_category,
+        many_posts_with_published_locations
+):
+    kwargs = {
+        key: value.format(user=user, category=published_category)
+        for key, value in kwargs.items()
+    }
+    plan = _explain(_feed_queryset(view_cls, another_user, **kwargs))
+    _assert_uses_index(plan, page)
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is SQLite only'
+)
+def test_own_profile_query_plan(user, many_posts_with_published_locations):
+    plan = _explain(
+        _feed_queryset(ProfileView, user, username=user.username)
+    )
+    _assert_uses_index(plan, 'своего профиля')
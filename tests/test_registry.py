@@ -0,0 +1,64 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Category
+from blog.registry import REFERENCES_VERSION_KEY, references
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [query['sql'] for query in queries.captured_queries]
+
+
+@pytest.mark.parametrize(
+    'url', ['/', '/category/{category.slug}/'], ids=['index', 'category']
+)
+def test_feed_reads_references_from_memory(
+        client, published_category, published_location,
+        post_with_published_location, url):
+    url = url.format(category=published_category)
+    client.get(url)
+    response, queries = _get(client, url)
+    content = response.content.decode('utf-8')
+    assert published_category.title in content
+    assert published_location.name in content
+    assert not any(
+        'blog_category' in sql or 'blog_location' in sql for sql in queries
+    ), (
+        'Убедитесь, что категории и местоположения ленты берутся из памяти,'
+        ' а не запрашиваются из базы данных.'
+    )
+
+
+def test_registry_reloads_on_save(published_category):
+    assert references.get_category(published_category.pk).title == (
+        published_category.title)
+    published_category.title = 'Новое название'
+    published_category.save()
+    assert references.get_category(published_category.pk).title == (
+        'Новое название'
+    ), 'Убедитесь, что реестр категорий обновляется после сохранения.'
+
+
+def test_registry_reloads_on_version_change(published_category):
+    references.get_category(published_category.pk)
+    # Another worker saved the category and replaced the version stamp.
+    Category.objects.filter(pk=published_category.pk).update(slug='moved')
+    assert references.get_category_by_slug('moved') is None
+    cache.set(REFERENCES_VERSION_KEY, 'another-version')
+    assert references.get_category_by_slug('moved').pk == (
+        published_category.pk
+    ), 'Убедитесь, что реестр перезагружается при смене метки версии.'
+
+
+def test_unpublished_category_404(client, published_category):
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(f'/category/{published_category.slug}/').status_code == (
+        404
+    )
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.signals import post_published
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def due_post(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    # The pub_date passes without any write to the post.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    return post
+
+
+def test_scheduled_post_hidden(client, future_posts):
+    assert not Post.objects.filter(is_visible=True).exists(), (
+        'Убедитесь, что отложенные публикации не видны до наступления'
+        ' даты публикации.'
+    )
+
+
+def test_publish_scheduled_posts(client, due_post):
+    client.get('/')
+    sent = []
+
+    def receiver(sender, instance, **kwargs):
+        sent.append(instance.pk)
+
+    post_published.connect(receiver)
+    try:
+        call_command('publish_scheduled_posts', stdout=StringIO())
+    finally:
+        post_published.disconnect(receiver)
+
+    assert sent == [due_post.pk], (
+        'Убедитесь, что при публикации отложенного поста отправляется'
+        ' сигнал `post_published`.'
+    )
+    response = client.get('/')
+    assert [post.pk for post in response.context['page_obj']] == [
+        due_post.pk], (
+        'Убедитесь, что отложенный пост появляется в ленте, когда'
+        ' наступает дата его публикации.'
+    )
+    assert response.context['paginator'].count == 1
+
+
+def test_unpublished_scheduled_post_stays_hidden(due_post):
+    Post.objects.filter(pk=due_post.pk).update(is_published=False)
+    call_command('publish_scheduled_posts', stdout=StringIO())
+    assert not Post.objects.get(pk=due_post.pk).is_visible
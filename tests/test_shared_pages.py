@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.mixins import PageCacheMixin
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def shared_pages(monkeypatch):
+    monkeypatch.setattr(PageCacheMixin, 'shared_pages', True)
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        Comment, post=post_with_published_location, author=user)
+
+
+def test_detail_shared_between_users(
+        user_client, another_user_client, django_assert_num_queries,
+        own_comment):
+    url = f'/posts/{own_comment.post.id}/'
+    content = user_client.get(url).content.decode('utf-8')
+    assert 'csrfmiddlewaretoken' not in content
+    assert 'Отредактировать публикацию' not in content
+    for slot in ('header', 'post-actions', 'comment-form',
+                 f'comment-actions-{own_comment.id}'):
+        assert f'data-slot="{slot}"' in content, (
+            'Убедитесь, что в общей странице публикации вместо частей'
+            ' для читателя оставлены места для фрагментов.'
+        )
+    with django_assert_num_queries(0):
+        response = another_user_client.get(url)
+    assert response.content.decode('utf-8') == content, (
+        'Убедитесь, что общая страница публикации отдаётся из кеша всем'
+        ' пользователям.'
+    )
+
+
+def test_fragments_of_author(user_client, user, own_comment):
+    post = own_comment.post
+    response = user_client.get('/fragments/', {'post': post.id})
+    content = response.content.decode('utf-8')
+    assert 'no-cache' in response['Cache-Control']
+    assert user.username in content
+    assert f'/posts/{post.id}/edit/' in content
+    assert 'csrfmiddlewaretoken' in content
+    assert f'/edit_comment/{own_comment.id}/' in content, (
+        'Убедитесь, что фрагменты автора содержат ссылки на редактирование'
+        ' публикации и комментариев и форму комментария.'
+    )
+
+
+def test_fragments_of_anonymous(client, own_comment):
+    content = client.get(
+        '/fragments/', {'post': own_comment.post.id}).content.decode('utf-8')
+    assert '/auth/login/' in content
+    assert 'data-slot="post-actions"' not in content
+    assert 'data-slot="comment-form"' not in content
+
+
+def test_own_profile_not_shared(user_client, user):
+    content = user_client.get(f'/profile/{user.username}/').content.decode(
+        'utf-8')
+    assert 'Редактировать профиль' in content, (
+        'Убедитесь, что собственный профиль не отдаётся как общая страница.'
+    )
+
+
+def test_unpublished_post_not_shared(
+        user_client, client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert 'Отредактировать публикацию' in content
+    assert client.get(f'/posts/{post.id}/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_cached_not_found_not_shared_with_author(
+        user_client, client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f'/posts/{post.id}/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert 'Отредактировать публикацию' in content, (
+        'Убедитесь, что закешированная для анонимов страница 404 не'
+        ' отдаётся автору неопубликованной публикации.'
+    )
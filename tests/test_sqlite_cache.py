@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from core import cache as sqlite_cache
+from core.cache import SQLiteCache
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(**options):
+        return SQLiteCache(tmp_path / 'cache.sqlite3', {'OPTIONS': options})
+    return make
+
+
+def test_basic_operations(make_cache):
+    cache = make_cache()
+    cache.set('post', {'title': 'Пост'})
+    cache.set_many({'count': 3, 'flag': True})
+    assert cache.get('post') == {'title': 'Пост'}
+    assert cache.get_many(['count', 'flag', 'missing']) == {
+        'count': 3, 'flag': True}
+    assert not cache.add('count', 5)
+    assert cache.add('new', 5)
+    assert cache.delete('new') and not cache.delete('new')
+    cache.delete_many(['post', 'count'])
+    assert cache.get('post', 'default') == 'default'
+
+
+def test_expiry(make_cache):
+    cache = make_cache()
+    cache.set('expired', 1, 0)
+    cache.set('forever', 1, None)
+    assert cache.get('expired') is None
+    assert cache.add('expired', 2)
+    assert cache.get('expired') == 2
+    assert cache.touch('forever', 60)
+    assert 'forever' in cache
+
+
+def test_versions(make_cache):
+    cache = make_cache()
+    cache.set('key', 'one', version=1)
+    assert cache.get('key', version=2) is None
+    cache.incr_version('key')
+    assert cache.get('key', version=2) == 'one'
+
+
+def test_shared_between_instances(make_cache):
+    writer, reader = make_cache(), make_cache()
+    writer.set('key', 'value')
+    assert reader.get('key') == 'value', (
+        'Убедитесь, что записи кеша видны всем воркерам, открывшим файл.'
+    )
+
+
+def test_incr_atomic(make_cache):
+    make_cache().set('counter', 0)
+
+    def increment():
+        cache = make_cache()
+        for _ in range(50):
+            cache.incr('counter')
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert make_cache().get('counter') == 200
+    with pytest.raises(ValueError):
+        make_cache().incr('missing')
+
+
+def test_lru_eviction(make_cache, monkeypatch):
+    monkeypatch.setattr(sqlite_cache, 'ACCESS_RESOLUTION', 0)
+    cache = make_cache(MAX_ENTRIES=3)
+    for key in 'abc':
+        cache.set(key, key)
+        time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.set('d', 'd')
+    assert cache.get_many('abcd') == {'a': 'a', 'c': 'c', 'd': 'd'}, (
+        'Убедитесь, что при переполнении кеша вытесняются давно не'
+        ' читанные записи.'
+    )
+
+
+def test_size_bound(make_cache):
+    cache = make_cache(MAX_SIZE=10_000)
+    for number in range(20):
+        cache.set(number, b'x' * 1_000)
+    entries, size = cache.connection.execute(
+        'SELECT entries, size FROM cache_stats').fetchone()
+    assert size <= 10_000 and entries < 20
+    cache.clear()
+    assert cache.connection.execute(
+        'SELECT entries, size FROM cache_stats').fetchone() == (0, 0)
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+from django.db import OperationalError
+
+from blog import pagecache
+from blog.feeds import invalidate_posts
+from blog.models import Post
+from blog.views import PostDetailView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def expire_at_once(monkeypatch):
+    monkeypatch.setattr(pagecache, 'PAGE_CACHE_TIMEOUT', 0)
+
+
+def _lock_database(monkeypatch, error=OperationalError):
+    def get_object(self, queryset=None):
+        raise error('database is locked')
+    monkeypatch.setattr(PostDetailView, 'get_object', get_object)
+
+
+@pytest.mark.usefixtures('expire_at_once')
+def test_expired_page_served_then_revalidated(
+        client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    client.get(url)
+    # No signals: nothing purges the cached page.
+    Post.objects.filter(pk=post.pk).update(title='Новый заголовок')
+    assert post.title in client.get(url).content.decode('utf-8'), (
+        'Убедитесь, что истёкшая страница отдаётся из кеша, пока она'
+        ' обновляется.'
+    )
+    assert 'Новый заголовок' in client.get(url).content.decode('utf-8'), (
+        'Убедитесь, что истёкшая страница обновляется после ответа.'
+    )
+
+
+@pytest.mark.usefixtures('expire_at_once')
+def test_failed_revalidation_keeps_stale(
+        client, monkeypatch, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    content = client.get(url).content
+    _lock_database(monkeypatch)
+    for _ in range(2):
+        response = client.get(url)
+        assert response.status_code == 200 and response.content == content, (
+            'Убедитесь, что при ошибке обновления истёкшей страницы'
+            ' продолжает отдаваться её устаревшая копия.'
+        )
+
+
+@pytest.mark.parametrize(
+    'error', [OperationalError, sqlite3.OperationalError],
+    ids=['database', 'cache']
+)
+def test_purged_page_served_on_database_error(
+        client, monkeypatch, post_with_published_location, error):
+    url = f'/posts/{post_with_published_location.id}/'
+    content = client.get(url).content
+    invalidate_posts(post_with_published_location.id)
+    _lock_database(monkeypatch, error)
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == content, (
+        'Убедитесь, что при ошибке базы данных отдаётся устаревшая копия'
+        ' страницы.'
+    )
+
+
+def test_database_error_without_copy(
+        client, monkeypatch, post_with_published_location):
+    _lock_database(monkeypatch)
+    with pytest.raises(OperationalError):
+        client.get(f'/posts/{post_with_published_location.id}/')
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+
+from blog import locks
+from blog.feeds import invalidate_posts
+from blog.pagecache import get_page_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def short_wait(monkeypatch):
+    monkeypatch.setattr(locks, 'CACHE_LOCK_WAIT', 0.5)
+    monkeypatch.setattr(locks, 'CACHE_LOCK_POLL', 0.01)
+
+
+def _fail():
+    raise AssertionError(
+        'Убедитесь, что значение пересчитывает только воркер,'
+        ' захвативший блокировку.'
+    )
+
+
+def test_waits_for_value_of_lock_holder():
+    assert locks.acquire('hot')
+    timer = threading.Timer(0.05, cache.set, ('hot', 42))
+    timer.start()
+    try:
+        assert locks.get_or_compute('hot', _fail, 60) == 42
+    finally:
+        timer.join()
+
+
+def test_computes_after_waiting_in_vain():
+    assert locks.acquire('hot')
+    assert locks.get_or_compute('hot', lambda: 42, 60) == 42
+    assert cache.get('hot') == 42
+
+
+def test_lock_released_on_error():
+    with pytest.raises(ZeroDivisionError):
+        locks.get_or_compute('hot', lambda: 1 / 0, 60)
+    assert locks.acquire('hot'), (
+        'Убедитесь, что блокировка снимается при ошибке пересчёта.'
+    )
+
+
+def test_previous_page_served_while_locked(
+        client, django_assert_num_queries, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    content = client.get(url).content
+    invalidate_posts(post_with_published_location.id)
+    assert locks.acquire(get_page_key(url))
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.content == content, (
+        'Убедитесь, что пока страницу обновляет другой воркер, отдаётся'
+        ' её предыдущая копия.'
+    )
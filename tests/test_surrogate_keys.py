@@ -0,0 +1,181 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.db import transaction
+
+from blog import edge
+from blog.edge import BasePurger, get_surrogate_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+class RecordingPurger(BasePurger):
+    """Keeps the keys of every purge with the thread it ran in."""
+
+    calls = []
+
+    def purge(self, keys):
+        self.calls.append((threading.current_thread(), keys))
+
+
+@pytest.fixture
+def recorded(settings):
+    RecordingPurger.calls = []
+    settings.EDGE_PURGERS = [{'BACKEND': f'{__name__}.RecordingPurger'}]
+    return RecordingPurger.calls
+
+
+@pytest.fixture
+def purges(settings):
+    """Keys received by a local stand-in for the HTTP cache."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_PURGE(self):
+            received.extend(self.headers['Surrogate-Key'].split())
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EDGE_PURGERS = [{
+        'BACKEND': 'blog.edge.HttpPurger',
+        'OPTIONS': {'url': f'http://127.0.0.1:{server.server_port}/'},
+    }]
+    yield received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('tag, key', [
+    ('feed:index', 'feed-index'),
+    ('feed:category:travel', 'category-travel'),
+    ('feed:author:7', 'author-7'),
+    ('feed:author:7:all', 'author-7'),
+    ('user:7', 'author-7'),
+    ('post:42', 'post-42'),
+])
+def test_surrogate_key(tag, key):
+    assert get_surrogate_key(tag) == key
+
+
+@pytest.mark.parametrize(
+    'url, keys',
+    [
+        ('/', ['feed-index', 'post-{post.id}']),
+        ('/category/{post.category.slug}/',
+         ['category-{post.category.slug}', 'post-{post.id}']),
+        ('/profile/{post.author.username}/',
+         ['author-{post.author_id}', 'post-{post.id}']),
+        ('/posts/{post.id}/', ['post-{post.id}']),
+    ],
+    ids=['index', 'category', 'profile', 'detail']
+)
+def test_pages_tagged(client, post_with_published_location, url, keys):
+    post = post_with_published_location
+    url = url.format(post=post)
+    keys = [key.format(post=post) for key in keys]
+    for response in (client.get(url), client.get(url)):
+        assert response['Surrogate-Key'].split() == keys, (
+            'Убедитесь, что страницы помечены суррогатными ключами своего'
+            ' содержимого, и из кеша, и после отрисовки.'
+        )
+        assert response['Surrogate-Control'].startswith('max-age=')
+
+
+def test_personal_page_not_stored(user_client, post_with_published_location):
+    response = user_client.get(f'/posts/{post_with_published_location.id}/')
+    assert 'Surrogate-Key' not in response
+    assert response['Surrogate-Control'] == 'no-store', (
+        'Убедитесь, что страницы читателя не сохраняются в HTTP-кеше.'
+    )
+
+
+def test_purged_on_commit(
+        post_with_published_location, purges,
+        django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.title = 'Новый заголовок'
+        post.save()
+    assert not purges, (
+        'Убедитесь, что ключи сбрасываются после фиксации транзакции.'
+    )
+    for callback in callbacks:
+        callback()
+    edge.flush()
+    assert {
+        'feed-index',
+        f'category-{post.category.slug}',
+        f'author-{post.author_id}',
+        f'post-{post.id}',
+    } <= set(purges), (
+        'Убедитесь, что при изменении публикации сбрасываются ключи её'
+        ' страницы и лент.'
+    )
+
+
+def test_comment_purges_post(
+        post_with_published_location, purges,
+        django_capture_on_commit_callbacks, user):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.comments.create(author=user, text='Комментарий')
+    edge.flush()
+    assert f'post-{post.id}' in purges
+
+
+def test_purge_failure_does_not_break_save(
+        settings, django_capture_on_commit_callbacks,
+        post_with_published_location, caplog):
+    settings.EDGE_PURGERS = [{
+        'BACKEND': 'blog.edge.HttpPurger',
+        'OPTIONS': {'url': 'http://127.0.0.1:9/', 'timeout': 0.5},
+    }]
+    with django_capture_on_commit_callbacks(execute=True):
+        post_with_published_location.save()
+    edge.flush()
+    assert 'Purging' in caplog.text
+
+
+def test_keys_sent_once_per_transaction(
+        post_with_published_location, recorded,
+        django_capture_on_commit_callbacks, user):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = 'Новый заголовок'
+        post.save()
+        post.comments.create(author=user, text='Комментарий')
+    edge.flush()
+    assert len(recorded) == 1, (
+        'Убедитесь, что ключи транзакции отправляются одним запросом.'
+    )
+    thread, keys = recorded[0]
+    assert {'feed-index', f'post-{post.id}'} <= set(keys)
+    assert thread is not threading.current_thread(), (
+        'Убедитесь, что ключи отправляются не в потоке запроса.'
+    )
+
+
+def test_rolled_back_savepoint_keeps_collecting(
+        recorded, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            edge.purge_tags('post:1')
+            transaction.set_rollback(True)
+        edge.purge_tags('post:2')
+    edge.flush()
+    assert [keys for _, keys in recorded] == [['post-2']], (
+        'Убедитесь, что ключи отменённой точки сохранения не отправляются,'
+        ' а последующие не теряются.'
+    )
+
+
+def test_base_purger_is_abstract():
+    with pytest.raises(TypeError):
+        BasePurger()
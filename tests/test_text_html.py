@@ -0,0 +1,55 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from blog.constants import TEXT_HTML_VERSION
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _cached_html(obj):
+    return cache.get(obj.get_text_html_key(), version=TEXT_HTML_VERSION)
+
+
+def test_text_html_rendered_on_save(mixer, post_with_published_location):
+    post = post_with_published_location
+    post.text = 'первая <b>строка</b>\nвторая'
+    post.save()
+    comment = mixer.blend(Comment, post=post, text='да\nнет')
+    assert _cached_html(post) == (
+        'первая &lt;b&gt;строка&lt;/b&gt;<br>вторая'), (
+        'Убедитесь, что HTML текста публикации формируется при сохранении.'
+    )
+    assert _cached_html(comment) == 'да<br>нет'
+
+    comment.delete()
+    assert _cached_html(comment) is None
+
+
+def test_detail_uses_text_html(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend(Comment, post=post)
+    for obj in (post, comment):
+        cache.set(
+            obj.get_text_html_key(), f'<p id="html-{obj.pk}">готово</p>',
+            version=TEXT_HTML_VERSION
+        )
+    content = user_client.get(f'/posts/{post.pk}/').content.decode('utf-8')
+    for obj in (post, comment):
+        assert f'<p id="html-{obj.pk}">готово</p>' in content, (
+            'Убедитесь, что страница публикации выводит заранее подготовленный'
+            ' HTML текста публикации и комментариев.'
+        )
+
+
+def test_backfill_command(mixer, post_with_published_location):
+    comment = mixer.blend(
+        Comment, post=post_with_published_location, text='раз\nдва')
+    cache.clear()
+    call_command('render_text_html', stdout=StringIO())
+    assert _cached_html(Post.objects.get(pk=post_with_published_location.pk))
+    assert _cached_html(comment) == 'раз<br>два'
@@ -0,0 +1,144 @@
+import pytest
+from django.core.cache import caches
+from django.core.signals import request_started
+
+from core.cache import TwoTierCache
+
+pytestmark = [pytest.mark.django_db]
+
+NAMESPACES = {'posts': ['post:'], 'categories': ['categories']}
+
+
+@pytest.fixture
+def make_worker():
+    workers = []
+
+    def make():
+        # Each worker is a process with its own L1.
+        worker = TwoTierCache(f'worker-{len(workers)}', {'OPTIONS': {
+            'L2': 'shared', 'NAMESPACES': NAMESPACES,
+        }})
+        workers.append(worker)
+        return worker
+    yield make
+    for worker in workers:
+        worker._l1.clear()
+
+
+@pytest.fixture
+def l2_reads(monkeypatch):
+    reads = []
+    l2 = caches['shared']
+    get_many = l2.get_many
+
+    def counting_get_many(keys, version=None):
+        keys = list(keys)
+        reads.append(keys)
+        return get_many(keys, version)
+
+    monkeypatch.setattr(l2, 'get_many', counting_get_many)
+    return reads
+
+
+def test_l1_hit_skips_l2(make_worker, l2_reads):
+    worker = make_worker()
+    worker.set('post:1', 'Пост')
+    worker.get('post:1')
+    l2_reads.clear()
+    request_started.send(sender=None)
+    for _ in range(3):
+        assert worker.get('post:1') == 'Пост'
+    assert l2_reads == [[
+        worker.get_version_key('categories'), worker.get_version_key('posts')
+    ]] or l2_reads == [[
+        worker.get_version_key('posts'), worker.get_version_key('categories')
+    ]], (
+        'Убедитесь, что горячие ключи читаются из памяти процесса, а общий'
+        ' кеш запрашивается один раз за запрос ради счётчиков версий.'
+    )
+
+
+def test_delete_retires_copies_of_other_workers(make_worker):
+    writer, reader = make_worker(), make_worker()
+    writer.set('post:1', 'Старый')
+    assert reader.get('post:1') == 'Старый'
+    writer.delete('post:1')
+    writer.set('post:1', 'Новый')
+    request_started.send(sender=None)
+    assert reader.get('post:1') == 'Новый', (
+        'Убедитесь, что сброс ключа в одном воркере сбрасывает копии ключей'
+        ' этого пространства имён в остальных.'
+    )
+    writer.delete('post:1')
+    request_started.send(sender=None)
+    assert reader.get('post:1') is None
+
+
+def test_fills_keep_copies(make_worker, l2_reads):
+    writer, reader = make_worker(), make_worker()
+    writer.set('post:1', 'Пост')
+    reader.get('post:1')
+    writer.set_many({'post:2': 'Другой пост'})
+    assert writer.add('post:3', 'Третий пост')
+    request_started.send(sender=None)
+    l2_reads.clear()
+    assert reader.get('post:1') == 'Пост'
+    assert not any('post:1' in keys for keys in l2_reads), (
+        'Убедитесь, что заполнение ключей не сбрасывает копии в памяти'
+        ' других воркеров.'
+    )
+    assert writer.get('post:3') == 'Третий пост'
+
+
+def test_other_namespaces_kept(make_worker, l2_reads):
+    writer, reader = make_worker(), make_worker()
+    writer.set('categories', ['Путешествия'])
+    reader.get('categories')
+    writer.delete('post:1')
+    request_started.send(sender=None)
+    l2_reads.clear()
+    assert reader.get('categories') == ['Путешествия']
+    assert not any('categories' in keys for keys in l2_reads)
+
+
+def test_keys_outside_namespaces_not_kept(make_worker):
+    writer, reader = make_worker(), make_worker()
+    writer.set('lock:post:1', True)
+    assert reader.get('lock:post:1')
+    caches['shared'].delete('lock:post:1')
+    assert reader.get('lock:post:1') is None, (
+        'Убедитесь, что ключи вне пространств имён, например блокировки,'
+        ' всегда читаются из общего кеша.'
+    )
+
+
+def test_lost_counters(make_worker):
+    writer, reader = make_worker(), make_worker()
+    writer.set('post:1', 'Старый')
+    reader.get('post:1')
+    caches['shared'].clear()
+    caches['shared'].set('post:1', 'Новый')
+    request_started.send(sender=None)
+    assert reader.get('post:1') == 'Новый', (
+        'Убедитесь, что копии в памяти сбрасываются, если счётчики версий'
+        ' вытеснены из общего кеша.'
+    )
+
+
+def test_page_render_keeps_counters(client, post_with_published_location):
+    cache = caches['default']
+    client.get('/posts/99999/')
+    client.get(f'/posts/{post_with_published_location.id}/')
+    client.get('/')
+    counters = caches['shared'].get_many(
+        cache.get_version_key(namespace)
+        for namespace in cache.get_versions()
+    )
+    assert counters
+    client.get('/posts/99998/')
+    client.get('/?page=2')
+    client.get(f'/posts/{post_with_published_location.id}/?ref=1')
+    assert caches['shared'].get_many(counters) == counters, (
+        'Убедитесь, что отрисовка и кеширование страниц не сбрасывают'
+        ' копии в памяти воркеров.'
+    )
@@ -0,0 +1,60 @@
+import pytest
+from django.test import Client
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _is_visible(post) -> bool:
+    return Post.objects.values_list('is_visible', flat=True).get(pk=post.pk)
+
+
+def test_visibility_follows_post(post_with_published_location):
+    post = post_with_published_location
+    assert _is_visible(post), (
+        'Убедитесь, что опубликованный пост в опубликованной категории'
+        ' отмечается как видимый (`is_visible`).'
+    )
+    post.is_published = False
+    post.save(update_fields=('is_published',))
+    assert not _is_visible(post), (
+        'Убедитесь, что при снятии поста с публикации сбрасывается'
+        ' `is_visible`.'
+    )
+
+
+def test_visibility_follows_category(
+        published_category, post_with_published_location):
+    published_category.is_published = False
+    published_category.save()
+    assert not _is_visible(post_with_published_location), (
+        'Убедитесь, что при снятии категории с публикации её посты'
+        ' перестают быть видимыми.'
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert _is_visible(post_with_published_location)
+
+
+def test_visibility_on_category_delete(
+        published_category, post_with_published_location):
+    published_category.delete()
+    assert not _is_visible(post_with_published_location)
+
+
+def test_visibility_from_category_admin(
+        admin_user, published_category, post_with_published_location):
+    client = Client()
+    client.force_login(admin_user)
+    response = client.post('/admin/blog/category/', {
+        'form-TOTAL_FORMS': 1,
+        'form-INITIAL_FORMS': 1,
+        'form-0-id': published_category.id,
+        '_save': 'Сохранить',
+    })
+    assert response.status_code == 302
+    assert not _is_visible(post_with_published_location), (
+        'Убедитесь, что `is_visible` обновляется при снятии категории с'
+        ' публикации из списка категорий в админке.'
+    )